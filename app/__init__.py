@@ -3,7 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_mail import Mail
-from config import Config
+from config import get_config
 import os
 
 db = SQLAlchemy()
@@ -13,10 +13,16 @@ login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Please log in to access this page.'
 mail = Mail()
 
-def create_app(config_class=Config):
+def create_app(config_class=None):
+    if config_class is None:
+        config_class = get_config()
     app = Flask(__name__, instance_relative_config=True)
     app.config.from_object(config_class)
 
+    # Leveled, structured logging through a background queue listener
+    from app.logging_setup import init_logging
+    init_logging(app)
+
     # Ensure the instance folder exists for the SQLite DB
     try:
         os.makedirs(app.instance_path)
@@ -28,16 +34,18 @@ def create_app(config_class=Config):
     login_manager.init_app(app)
     mail.init_app(app)
 
-    # Register SQLite foreign key pragma
-    from sqlalchemy import event
-    from sqlalchemy.engine import Engine
-    
-    @event.listens_for(Engine, "connect")
-    def set_sqlite_pragma(dbapi_connection, connection_record):
-        if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys=ON")
-            cursor.close()
+    # Per-connection SQLite pragmas (WAL, busy timeout, cache sizes) from the config profile
+    from app.sqlite_profile import init_sqlite
+    init_sqlite(app)
+
+    # Per-request SQL count/timing: Server-Timing headers and the admin metrics page
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    # Repeated-SELECT (N+1) detection; 'warn' in development, 'raise' under test
+    from app.nplusone import init_nplusone
+    init_nplusone(app)
+
     from app.auth import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
 
@@ -53,6 +61,9 @@ def create_app(config_class=Config):
     from app.api import bp as api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
 
+    from app.commands import register_commands
+    register_commands(app)
+
     # Root route redirects to login
     @app.route('/')
     def index():
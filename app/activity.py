@@ -0,0 +1,92 @@
+import atexit
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import func
+from app.models import LoginEvent, db
+
+# Sign-ins are buffered in memory and written by a background thread in one
+# executemany, so the login request itself never opens a write transaction.
+_lock = threading.Lock()
+_buffer = []
+_flusher = None
+
+
+def _trim():
+    # Call holding _lock. While the database is unreachable the buffer only grows,
+    # so past LOGIN_ACTIVITY_BUFFER_MAX the oldest sign-ins are given up.
+    excess = len(_buffer) - current_app.config.get('LOGIN_ACTIVITY_BUFFER_MAX', 10000)
+    if excess > 0:
+        del _buffer[:excess]
+        current_app.logger.warning('Login activity buffer full; dropped %d oldest sign-in(s)', excess)
+
+
+def record_login(user_id, ip_address=None):
+    with _lock:
+        _buffer.append({'user_id': user_id, 'logged_in_at': datetime.utcnow(), 'ip_address': ip_address})
+        _trim()
+    _ensure_flusher(current_app._get_current_object())
+
+
+def flush():
+    global _buffer
+    with _lock:
+        rows, _buffer = _buffer, []
+    if not rows:
+        return 0
+    try:
+        db.session.execute(LoginEvent.__table__.insert(), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Put the rows back so the next flush retries them
+        with _lock:
+            _buffer[:0] = rows
+            _trim()
+        raise
+    return len(rows)
+
+
+def last_logins(user_ids=None):
+    """Map user_id -> most recent sign-in, including sign-ins not flushed yet."""
+    statement = db.select(LoginEvent.user_id, func.max(LoginEvent.logged_in_at)).group_by(LoginEvent.user_id)
+    if user_ids is not None:
+        statement = statement.where(LoginEvent.user_id.in_(user_ids))
+    latest = dict(db.session.execute(statement).all())
+    with _lock:
+        pending = [row for row in _buffer if user_ids is None or row['user_id'] in user_ids]
+    for row in pending:
+        if latest.get(row['user_id']) is None or row['logged_in_at'] > latest[row['user_id']]:
+            latest[row['user_id']] = row['logged_in_at']
+    return latest
+
+
+def _run_flusher(app, interval):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                flush()
+            except Exception:
+                app.logger.exception('Failed to flush login activity')
+
+
+def _ensure_flusher(app):
+    global _flusher
+    interval = app.config.get('LOGIN_ACTIVITY_FLUSH_INTERVAL', 5)
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is not None:
+            return
+        if interval > 0:
+            _flusher = threading.Thread(target=_run_flusher, args=(app, interval), name='login-activity-flusher', daemon=True)
+            _flusher.start()
+        else:
+            _flusher = False
+
+        def flush_on_exit():
+            with app.app_context():
+                flush()
+        atexit.register(flush_on_exit)
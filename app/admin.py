@@ -1,12 +1,26 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+import logging
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, current_app
 from flask_login import login_required
 from app import db
-from app.models import User, Class, Section, Group, Subject, Chapter, Topic, teacher_assignments
-from app.forms import UserForm, ClassForm, SubjectForm, ChapterForm, TopicForm, AssignmentForm
+from app.models import User, Class, Section, Group, Subject, Chapter, Topic, ProgressCounter, teacher_assignments
+from app.forms import UserForm, ClassForm, SubjectForm, ChapterForm, TopicForm, AssignmentForm, SyllabusImportForm
+from app.importer import import_syllabus as import_syllabus_rows, read_rows
 from app.utils import role_required
-from sqlalchemy import or_, func
+from app.counters import adjust_counters
+from app.versioning import bump_version
+from app.authz import invalidate_assignments
+from app.activity import last_logins
+from app.listing import keyset_page, page_size, wants_json
+from app.metrics import summarize, samples as metric_samples, reset as reset_metric_samples
+from app.choices import (invalidate_choices, teacher_choices, class_choices, subject_choices, section_choices,
+                         group_choices, subject_label_choices, chapter_label_choices)
+from sqlalchemy import or_, and_, func
 
 bp = Blueprint('admin', __name__)
+logger = logging.getLogger(__name__)
+
+def _assignment_count():
+    return db.session.execute(db.select(func.count()).select_from(teacher_assignments)).scalar()
 
 @bp.route('/')
 @role_required('admin')
@@ -14,63 +28,96 @@ bp = Blueprint('admin', __name__)
 def dashboard():
     return render_template('admin/dashboard.html')
 
+@bp.route('/metrics')
+@role_required('admin')
+@login_required
+def metrics():
+    window = request.args.get('window', type=int)
+    return render_template('admin/metrics.html', rows=summarize(window), total=len(metric_samples()),
+                           enabled=current_app.config.get('REQUEST_METRICS', True))
+
+@bp.route('/metrics/reset', methods=['POST'])
+@role_required('admin')
+@login_required
+def reset_metrics():
+    reset_metric_samples()
+    flash('Request metrics cleared.', 'success')
+    return redirect(url_for('admin.metrics'))
+
 # --- User Management ---
+ROLES = ('admin', 'teacher', 'principal')
+USER_SORTS = {'name': User.full_name, 'username': User.username, 'role': User.role}
+CLASS_SORTS = {'name': Class.name}
+SUBJECT_SORTS = {'name': Subject.name, 'class': Class.name}
+ASSIGNMENT_SORTS = {'class': Class.name, 'subject': Subject.name, 'teacher': User.full_name}
+
+def _keyset_listing(statement, sorts, default_sort, id_column):
+    sort = request.args.get('sort', default_sort)
+    if sort not in sorts:
+        sort = default_sort
+    page = keyset_page(statement, sorts[sort], id_column, request.args.get('cursor'),
+                       page_size(), descending=request.args.get('dir') == 'desc')
+    return sort, page
+
+# Query parameters carried over into pager and sort links; anything else (including
+# url_for's own keywords such as endpoint or _external) is dropped
+LISTING_ARGS = ('role', 'q', 'class_id', 'teacher', 'sort', 'dir', 'per_page')
+
+def _page_urls(page):
+    # Links for the pager: the same filters and sort, from the start or from the next cursor
+    args = {key: request.args[key] for key in LISTING_ARGS if key in request.args}
+    first_url = url_for(request.endpoint, **args) if request.args.get('cursor') else None
+    next_url = url_for(request.endpoint, **args, cursor=page.next_cursor) if page.next_cursor else None
+    return {'first_url': first_url, 'next_url': next_url, 'listing_args': args}
+
 @bp.route('/users')
 @role_required('admin')
 @login_required
 def users():
-    users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    # ?role=&q=&sort=name|username|role&dir=asc|desc&cursor=
+    statement = db.select(User.id, User.username, User.full_name, User.email, User.role)
+    role = request.args.get('role')
+    if role in ROLES:
+        statement = statement.where(User.role == role)
+    search = request.args.get('q', '').strip()
+    if search:
+        statement = statement.where(or_(User.username.icontains(search, autoescape=True),
+                                        User.full_name.icontains(search, autoescape=True),
+                                        User.email.icontains(search, autoescape=True)))
+    sort, page = _keyset_listing(statement, USER_SORTS, 'name', User.id)
+    logins = last_logins([user.id for user in page.items])
+
+    if wants_json():
+        return jsonify({
+            'items': [{'id': user.id, 'username': user.username, 'full_name': user.full_name, 'email': user.email,
+                       'role': user.role, 'last_login': logins[user.id].isoformat() if logins.get(user.id) else None}
+                      for user in page.items],
+            'next_cursor': page.next_cursor
+        })
+    return render_template('admin/users.html', users=page.items, last_logins=logins, roles=ROLES,
+                           sort=sort, **_page_urls(page))
 
 @bp.route('/assignment/create', methods=['GET', 'POST'])
 @role_required('admin')
 @login_required
 def create_assignment():
-    import time
-    call_timestamp = time.time()
-    print("=" * 50)
-    print(f"create_assignment function called at {call_timestamp}")
-    print(f"Request method: {request.method}")
-    print("=" * 50)
-
     form = AssignmentForm()
-    form.teacher_id.choices = [(t.id, t.full_name) for t in User.query.filter_by(role='teacher').order_by('full_name').all()]
-    form.class_id.choices = [(c.id, c.name) for c in Class.query.order_by('name').all()]
+    form.teacher_id.choices = teacher_choices()
+    form.class_id.choices = class_choices()
 
     # Always set these choices BEFORE validate_on_submit!
     class_id = form.class_id.data or request.form.get('class_id', type=int)
     if class_id:
-        form.subject_id.choices = [(s.id, s.name) for s in Subject.query.filter_by(class_id=class_id).all()]
+        form.subject_id.choices = subject_choices(class_id)
         # Add None option for optional fields (using None instead of empty string)
-        form.section_id.choices = [(None, 'Select Section')] + [(s.id, s.name) for s in Section.query.filter_by(class_id=class_id).all()]
-        form.group_id.choices = [(None, 'Select Group')] + [(g.id, g.name) for g in Group.query.filter_by(class_id=class_id).all()]
+        form.section_id.choices = [(None, 'Select Section')] + section_choices(class_id)
+        form.group_id.choices = [(None, 'Select Group')] + group_choices(class_id)
     else:
         form.subject_id.choices = []
         form.section_id.choices = [(None, 'Select Section')]
         form.group_id.choices = [(None, 'Select Group')]
 
-    if request.method == 'POST':
-        print("Form errors:", form.errors)
-        print("Request.form:", request.form)
-        print("POST request received")
-        print("subject_id choices:", form.subject_id.choices)
-        print("subject_id submitted value:", request.form.get('subject_id'))
-        print("section_id choices:", form.section_id.choices)
-        print("section_id submitted value:", request.form.get('section_id'))
-        print("group_id choices:", form.group_id.choices)
-        print("group_id submitted value:", request.form.get('group_id'))
-        print("form.validate() result:", form.validate())
-        print("form.validate_on_submit() result:", form.validate_on_submit())
-
     if form.validate_on_submit():
-        print("Form validation successful")
-        print("Creating assignment for:")
-        print(f"  Teacher ID: {form.teacher_id.data}")
-        print(f"  Class ID: {form.class_id.data}")
-        print(f"  Subject ID: {form.subject_id.data} (will be validated)")
-        print(f"  Section ID: {form.section_id.data}")
-        print(f"  Group ID: {form.group_id.data}")
-
         # Validate that subject_id is actually selected (not None or empty)
         if not form.subject_id.data:
             flash('Please select a subject.', 'danger')
@@ -88,8 +135,6 @@ def create_assignment():
                 flash('Invalid subject selected.', 'danger')
                 return render_template('admin/edit_assignments.html', form=form, title='Create Assignment')
         
-        print(f"Validated Subject ID: {subject_id} (single integer)")
-
         # Get section_id and group_id from form (they're now properly coerced to None if empty)
         section_id = form.section_id.data
         group_id = form.group_id.data
@@ -109,24 +154,12 @@ def create_assignment():
             flash('This assignment already exists.', 'warning')
             return redirect(url_for('admin.assignments'))
         
-        # Count existing assignments BEFORE insert
-        count_before = db.session.execute(
-            db.select(func.count()).select_from(teacher_assignments)
-        ).scalar()
-        print(f"Assignments in database BEFORE insert: {count_before}")
-        
-        # Create ONLY ONE assignment - ensure we're using the validated subject_id
-        print("=" * 50)
-        print("INSERTING SINGLE ASSIGNMENT:")
-        print(f"  Teacher ID: {form.teacher_id.data}")
-        print(f"  Class ID: {form.class_id.data}")
-        print(f"  Subject ID: {subject_id} (SINGLE SUBJECT ONLY)")
-        print(f"  Section ID: {section_id}")
-        print(f"  Group ID: {group_id}")
-        print("=" * 50)
-        
-        # CRITICAL: Verify we're only inserting ONE record
-        # This is a SINGLE insert statement - it will only create ONE row
+        # The before/after row counts are only worth their queries when debugging
+        debugging = logger.isEnabledFor(logging.DEBUG)
+        if debugging:
+            count_before = _assignment_count()
+
+        # A single insert statement - it will only create ONE row
         stmt = teacher_assignments.insert().values(
             teacher_id=form.teacher_id.data,
             class_id=form.class_id.data,
@@ -137,42 +170,29 @@ def create_assignment():
         
         try:
             result = db.session.execute(stmt)
+            bump_version()
+            invalidate_assignments()
             db.session.commit()
-            
-            # Verify only ONE row was inserted
-            inserted_id = result.lastrowid
-            count_after = db.session.execute(
-                db.select(func.count()).select_from(teacher_assignments)
-            ).scalar()
-            
-            print(f"Assignment inserted with ID: {inserted_id}")
-            print(f"Assignments in database AFTER insert: {count_after}")
-            print(f"Difference: {count_after - count_before} assignment(s) created")
-            
-            if count_after - count_before != 1:
-                print("=" * 50)
-                print("WARNING: More than ONE assignment was created!")
-                print("This should not happen - investigating...")
-                print("=" * 50)
-            else:
-                print("SUCCESS: Only ONE assignment created!")
-                print("=" * 50)
-            
+            logger.info('Assignment created', extra={
+                'assignment_id': result.lastrowid, 'teacher_id': form.teacher_id.data, 'class_id': form.class_id.data,
+                'subject_id': subject_id, 'section_id': section_id, 'group_id': group_id
+            })
+            if debugging:
+                created = _assignment_count() - count_before
+                logger.log(logging.DEBUG if created == 1 else logging.WARNING,
+                           'Assignment rows created by one insert', extra={'rows_created': created})
+
             flash('Teacher assigned successfully.', 'success')
             return redirect(url_for('admin.assignments'))
         except Exception as e:
-            print("=" * 50)
-            print("ERROR creating assignment:", str(e))
-            print("Form errors:", form.errors)
-            print("Request form data:", request.form)
-            print("=" * 50)
             db.session.rollback()
+            logger.exception('Error creating assignment', extra={'teacher_id': form.teacher_id.data, 'subject_id': subject_id})
             flash(f'Error creating assignment: {str(e)}', 'danger')
 
-    return render_template('admin/edit_assignments.html', form=form, title='Create Assignment')
-
-
+    elif form.errors:
+        logger.debug('Assignment form rejected', extra={'errors': form.errors})
 
+    return render_template('admin/edit_assignments.html', form=form, title='Create Assignment')
 
 @bp.route('/user/create', methods=['GET', 'POST'])
 @role_required('admin')
@@ -195,9 +215,10 @@ def create_user():
         user.set_password('defaultpassword') # Set a default password
         db.session.add(user)
         try:
-        db.session.commit()
-        flash(f'User {form.username.data} created with default password: defaultpassword', 'success')
-        return redirect(url_for('admin.users'))
+            invalidate_choices()
+            db.session.commit()
+            flash(f'User {form.username.data} created with default password: defaultpassword', 'success')
+            return redirect(url_for('admin.users'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating user: {str(e)}', 'danger')
@@ -229,9 +250,11 @@ def edit_user(id):
         user.full_name = form.full_name.data
         user.role = form.role.data
         try:
-        db.session.commit()
-        flash('User information updated.', 'success')
-        return redirect(url_for('admin.users'))
+            bump_version()
+            invalidate_choices()
+            db.session.commit()
+            flash('User information updated.', 'success')
+            return redirect(url_for('admin.users'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error updating user: {str(e)}', 'danger')
@@ -243,8 +266,23 @@ def edit_user(id):
 @role_required('admin')
 @login_required
 def classes():
-    all_classes = Class.query.all()
-    return render_template('admin/classes.html', all_classes=all_classes)
+    def count(model):
+        return db.select(func.count(model.id)).where(model.class_id == Class.id).scalar_subquery()
+
+    statement = db.select(Class.id, Class.name, count(Section).label('section_count'),
+                          count(Group).label('group_count'), count(Subject).label('subject_count'))
+    search = request.args.get('q', '').strip()
+    if search:
+        statement = statement.where(Class.name.icontains(search, autoescape=True))
+    sort, page = _keyset_listing(statement, CLASS_SORTS, 'name', Class.id)
+
+    if wants_json():
+        return jsonify({
+            'items': [{'id': cls.id, 'name': cls.name, 'sections': cls.section_count,
+                       'groups': cls.group_count, 'subjects': cls.subject_count} for cls in page.items],
+            'next_cursor': page.next_cursor
+        })
+    return render_template('admin/classes.html', all_classes=page.items, sort=sort, **_page_urls(page))
 
 @bp.route('/class/create', methods=['GET', 'POST'])
 @role_required('admin')
@@ -261,9 +299,11 @@ def create_class():
         new_class = Class(name=form.name.data)
         db.session.add(new_class)
         try:
-        db.session.commit()
-        flash(f'{form.name.data} created.', 'success')
-        return redirect(url_for('admin.classes'))
+            bump_version()
+            invalidate_choices()
+            db.session.commit()
+            flash(f'{form.name.data} created.', 'success')
+            return redirect(url_for('admin.classes'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating class: {str(e)}', 'danger')
@@ -275,22 +315,41 @@ def create_class():
 @role_required('admin')
 @login_required
 def subjects():
-    all_subjects = Subject.query.all()
-    return render_template('admin/subjects.html', all_subjects=all_subjects)
+    chapter_count = db.select(func.count(Chapter.id)).where(Chapter.subject_id == Subject.id).scalar_subquery()
+    statement = db.select(Subject.id, Subject.name, Class.name.label('class_name'), chapter_count.label('chapter_count'))\
+        .join(Class, Subject.class_id == Class.id)
+    class_id = request.args.get('class_id', type=int)
+    if class_id:
+        statement = statement.where(Subject.class_id == class_id)
+    search = request.args.get('q', '').strip()
+    if search:
+        statement = statement.where(Subject.name.icontains(search, autoescape=True))
+    sort, page = _keyset_listing(statement, SUBJECT_SORTS, 'name', Subject.id)
+
+    if wants_json():
+        return jsonify({
+            'items': [{'id': subject.id, 'name': subject.name, 'class_name': subject.class_name,
+                       'chapters': subject.chapter_count} for subject in page.items],
+            'next_cursor': page.next_cursor
+        })
+    return render_template('admin/subjects.html', all_subjects=page.items, classes=class_choices(),
+                           selected_class=class_id, sort=sort, **_page_urls(page))
 
 @bp.route('/subject/create', methods=['GET', 'POST'])
 @role_required('admin')
 @login_required
 def create_subject():
     form = SubjectForm()
-    form.class_id.choices = [(c.id, c.name) for c in Class.query.order_by('name').all()]
+    form.class_id.choices = class_choices()
     if form.validate_on_submit():
         new_subject = Subject(name=form.name.data, class_id=form.class_id.data)
         db.session.add(new_subject)
         try:
-        db.session.commit()
-        flash(f'Subject {form.name.data} created.', 'success')
-        return redirect(url_for('admin.subjects'))
+            bump_version()
+            invalidate_choices()
+            db.session.commit()
+            flash(f'Subject {form.name.data} created.', 'success')
+            return redirect(url_for('admin.subjects'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating subject: {str(e)}', 'danger')
@@ -302,23 +361,101 @@ def create_subject():
 @role_required('admin')
 @login_required
 def syllabus():
-    # Get all classes with their subjects, ordered by class name
-    classes = Class.query.order_by('name').all()
-    return render_template('admin/syllabus.html', classes=classes)
+    # Only classes and subjects are rendered; chapters and topics load on expand
+    # from the paginated endpoints below, so the page stays small as the syllabus grows
+    chapter_counts = db.select(Chapter.subject_id, func.count(Chapter.id).label('chapter_count'))\
+        .group_by(Chapter.subject_id).subquery()
+    rows = db.session.execute(
+        db.select(Class.id, Class.name, Subject.id.label('subject_id'), Subject.name.label('subject_name'),
+                  func.coalesce(chapter_counts.c.chapter_count, 0).label('chapter_count'),
+                  func.coalesce(ProgressCounter.total_topics, 0).label('topic_count'))
+        .outerjoin(Subject, Subject.class_id == Class.id)
+        .outerjoin(chapter_counts, chapter_counts.c.subject_id == Subject.id)
+        .outerjoin(ProgressCounter, and_(ProgressCounter.scope == 'subject', ProgressCounter.entity_id == Subject.id))
+        .order_by(Class.name, Subject.name)
+    ).all()
+
+    classes = []
+    for row in rows:
+        if not classes or classes[-1]['id'] != row.id:
+            classes.append({'id': row.id, 'name': row.name, 'subjects': []})
+        if row.subject_id is not None:
+            classes[-1]['subjects'].append({
+                'id': row.subject_id,
+                'name': row.subject_name,
+                'chapter_count': row.chapter_count,
+                'topic_count': row.topic_count
+            })
+    return render_template('admin/syllabus.html', classes=classes,
+                           per_page=current_app.config.get('SYLLABUS_PAGE_SIZE', 50))
+
+def _syllabus_page(statement, name_column, to_json):
+    # ?page=1&per_page=50&q=search over a statement ordered by name
+    search = request.args.get('q', '').strip()
+    if search:
+        statement = statement.where(name_column.icontains(search, autoescape=True))
+    per_page = min(max(request.args.get('per_page', current_app.config.get('SYLLABUS_PAGE_SIZE', 50), type=int), 1), 200)
+    page = max(request.args.get('page', 1, type=int), 1)
+    total = db.session.scalar(db.select(func.count()).select_from(statement.subquery()))
+    items = db.session.execute(statement.order_by(name_column, 'id').limit(per_page).offset((page - 1) * per_page)).all()
+    return jsonify({
+        'items': [to_json(item) for item in items],
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'has_next': page * per_page < total
+    })
+
+@bp.route('/api/syllabus/subjects/<int:subject_id>/chapters')
+@role_required('admin')
+@login_required
+def api_syllabus_chapters(subject_id):
+    statement = db.select(Chapter.id, Chapter.name, func.coalesce(ProgressCounter.total_topics, 0).label('topic_count'))\
+        .outerjoin(ProgressCounter, and_(ProgressCounter.scope == 'chapter', ProgressCounter.entity_id == Chapter.id))\
+        .where(Chapter.subject_id == subject_id)
+    return _syllabus_page(statement, Chapter.name,
+                          lambda row: {'id': row.id, 'name': row.name, 'topic_count': row.topic_count})
+
+@bp.route('/api/syllabus/chapters/<int:chapter_id>/topics')
+@role_required('admin')
+@login_required
+def api_syllabus_topics(chapter_id):
+    statement = db.select(Topic.id, Topic.name).where(Topic.chapter_id == chapter_id)
+    return _syllabus_page(statement, Topic.name, lambda row: {'id': row.id, 'name': row.name})
+
+@bp.route('/syllabus/import', methods=['GET', 'POST'])
+@role_required('admin')
+@login_required
+def import_syllabus():
+    form = SyllabusImportForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            result = import_syllabus_rows(read_rows(upload.stream, upload.filename), dry_run=form.dry_run.data)
+        except ValueError as e:
+            flash(f'Could not read {upload.filename}: {e}', 'danger')
+        else:
+            verb = 'Would create' if form.dry_run.data else 'Imported'
+            flash(f'{verb} {result.subjects} subject(s), {result.chapters} chapter(s) and {result.topics} topic(s); '
+                  f'{result.skipped} existing topic(s) skipped.', 'warning' if result.errors else 'success')
+    return render_template('admin/import_syllabus.html', form=form, result=result)
 
 @bp.route('/chapter/create', methods=['GET', 'POST'])
 @role_required('admin')
 @login_required
 def create_chapter():
     form = ChapterForm()
-    form.subject_id.choices = [(s.id, f"{s.name} ({s.class_obj.name})") for s in Subject.query.order_by('name').all()]
+    form.subject_id.choices = subject_label_choices()
     if form.validate_on_submit():
         new_chapter = Chapter(name=form.name.data, subject_id=form.subject_id.data)
         db.session.add(new_chapter)
         try:
-        db.session.commit()
-        flash(f'Chapter {form.name.data} created.', 'success')
-        return redirect(url_for('admin.syllabus'))
+            bump_version()
+            invalidate_choices()
+            db.session.commit()
+            flash(f'Chapter {form.name.data} created.', 'success')
+            return redirect(url_for('admin.syllabus'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating chapter: {str(e)}', 'danger')
@@ -330,16 +467,16 @@ def create_chapter():
 @login_required
 def create_topic():
     form = TopicForm()
-    # Populate choices dynamically
-    chapters = Chapter.query.join(Subject).join(Class).order_by(Class.name, Subject.name, Chapter.name).all()
-    form.chapter_id.choices = [(c.id, f"{c.subject.class_obj.name} > {c.subject.name} > {c.name}") for c in chapters]
+    form.chapter_id.choices = chapter_label_choices()
     if form.validate_on_submit():
         new_topic = Topic(name=form.name.data, chapter_id=form.chapter_id.data)
         db.session.add(new_topic)
         try:
-        db.session.commit()
-        flash(f'Topic {form.name.data} created.', 'success')
-        return redirect(url_for('admin.syllabus'))
+            adjust_counters(form.chapter_id.data, total=1)
+            bump_version()
+            db.session.commit()
+            flash(f'Topic {form.name.data} created.', 'success')
+            return redirect(url_for('admin.syllabus'))
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating topic: {str(e)}', 'danger')
@@ -351,180 +488,77 @@ def create_topic():
 @role_required('admin')
 @login_required
 def assignments():
-    # This is a complex query to get all assignments with IDs
-    print("=" * 50)
-    print("FETCHING ASSIGNMENTS FROM DATABASE...")
-    
-    # First, let's check what's actually in the database
-    all_assignments_raw = db.session.execute(
-        db.select(teacher_assignments)
-    ).all()
-    print(f"Raw assignments in database: {len(all_assignments_raw)}")
-    for row in all_assignments_raw:
-        print(f"  Assignment ID: {row.id}, Teacher: {row.teacher_id}, Class: {row.class_id}, Subject: {row.subject_id}, Section: {row.section_id}")
-    
-    # Now get the formatted assignments
-    # CRITICAL FIX: Start from teacher_assignments table to avoid cartesian product
-    assigns = db.session.execute(
-        db.select(
-            teacher_assignments.c.id.label('assignment_id'),
-            User.full_name.label('teacher_name'),
-            Class.name.label('class_name'),
-            Section.name.label('section_name'),
-            Group.name.label('group_name'),
-            Subject.name.label('subject_name')
-        ).select_from(teacher_assignments)
-        .join(User, teacher_assignments.c.teacher_id == User.id)
-        .join(Class, teacher_assignments.c.class_id == Class.id)
-        .join(Subject, teacher_assignments.c.subject_id == Subject.id)  # This is the KEY - join on the actual subject_id in the assignment
-        .join(Section, teacher_assignments.c.section_id == Section.id, isouter=True)
-        .join(Group, teacher_assignments.c.group_id == Group.id, isouter=True)
-        .order_by(Class.name, Subject.name, User.full_name)
-    ).all()
-    
-    print(f"Formatted assignments returned: {len(assigns)}")
-    for assign in assigns:
-        print(f"  ID: {assign.assignment_id}, Teacher: {assign.teacher_name}, Class: {assign.class_name}, Subject: {assign.subject_name}")
-    print("=" * 50)
-    
-    return render_template('admin/assignments.html', assignments=assigns)
-
-<<<<<<< HEAD
-@bp.route('/assignment/create', methods=['GET', 'POST'])
-@role_required('admin')
-@login_required
-def create_assignment():
-    form = AssignmentForm()
-    form.teacher_id.choices = [(t.id, t.full_name) for t in User.query.filter_by(role='teacher').order_by('full_name').all()]
-    form.class_id.choices = [(c.id, c.name) for c in Class.query.order_by('name').all()]
-
-    # Initialize dynamic choices to empty lists to avoid TypeError
-    form.subject_id.choices = []
-    form.section_id.choices = []
-    form.group_id.choices = []
-
-    if request.method == 'POST':
-        class_id = request.form.get('class_id', type=int)
-        if class_id:
-            form.subject_id.choices = [(s.id, s.name) for s in Subject.query.filter_by(class_id=class_id).all()]
-            form.section_id.choices = [(s.id, s.name) for s in Section.query.filter_by(class_id=class_id).all()]
-            form.group_id.choices = [(g.id, g.name) for g in Group.query.filter_by(class_id=class_id).all()]
-    
-    if form.validate_on_submit():
-        # Get section_id and group_id from request form (they come from JavaScript)
-        section_id = request.form.get('section_id') or None
-        group_id = request.form.get('group_id') or None
-        
-        # Convert to int if not None
-        if section_id:
-            section_id = int(section_id)
-        if group_id:
-            group_id = int(group_id)
-        
-        # Check for existing assignment
-        existing = db.session.execute(
-            db.select(teacher_assignments).where(
-                teacher_assignments.c.teacher_id == form.teacher_id.data,
-                teacher_assignments.c.class_id == form.class_id.data,
-                teacher_assignments.c.subject_id == form.subject_id.data,
-                teacher_assignments.c.section_id == section_id,
-                teacher_assignments.c.group_id == group_id
-            )
-        ).first()
-
-        if existing:
-            flash('This assignment already exists.', 'warning')
-        else:
-            stmt = teacher_assignments.insert().values(
-                teacher_id=form.teacher_id.data,
-                class_id=form.class_id.data,
-                section_id=section_id,
-                group_id=group_id,
-                subject_id=form.subject_id.data
-            )
-            try:
-            db.session.execute(stmt)
-            db.session.commit()
-            flash('Teacher assigned successfully.', 'success')
-        return redirect(url_for('admin.assignments'))
-            except Exception as e:
-                db.session.rollback()
-                flash(f'Error creating assignment: {str(e)}', 'danger')
-    
-    return render_template('admin/edit_assignments.html', form=form, title='Create Assignment')
-
-    print("Form errors:", form.errors) # Debugging line
-    print("Request form data on validation fail:", request.form) # Debugging line
-
+    # Start from teacher_assignments so each assignment is exactly one row
+    statement = db.select(
+        teacher_assignments.c.id.label('assignment_id'),
+        User.full_name.label('teacher_name'),
+        Class.name.label('class_name'),
+        Section.name.label('section_name'),
+        Group.name.label('group_name'),
+        Subject.name.label('subject_name')
+    ).select_from(teacher_assignments)\
+    .join(User, teacher_assignments.c.teacher_id == User.id)\
+    .join(Class, teacher_assignments.c.class_id == Class.id)\
+    .join(Subject, teacher_assignments.c.subject_id == Subject.id)\
+    .join(Section, teacher_assignments.c.section_id == Section.id, isouter=True)\
+    .join(Group, teacher_assignments.c.group_id == Group.id, isouter=True)
+
+    class_id = request.args.get('class_id', type=int)
+    if class_id:
+        statement = statement.where(teacher_assignments.c.class_id == class_id)
+    teacher = request.args.get('teacher', '').strip()
+    if teacher:
+        statement = statement.where(User.full_name.icontains(teacher, autoescape=True))
+    sort, page = _keyset_listing(statement, ASSIGNMENT_SORTS, 'class', teacher_assignments.c.id)
+
+    if wants_json():
+        return jsonify({
+            'items': [{'id': assign.assignment_id, 'teacher_name': assign.teacher_name, 'class_name': assign.class_name,
+                       'section_name': assign.section_name, 'group_name': assign.group_name,
+                       'subject_name': assign.subject_name} for assign in page.items],
+            'next_cursor': page.next_cursor
+        })
+    return render_template('admin/assignments.html', assignments=page.items, classes=class_choices(),
+                           selected_class=class_id, sort=sort, **_page_urls(page))
 
-=======
->>>>>>> d272804f59c5a5dc8c1761db6f211c7d14627af9
 @bp.route('/api/sections-for-class/<int:class_id>')
 def api_sections_for_class(class_id):
-    sections = Section.query.filter_by(class_id=class_id).all()
-    return jsonify([{'id': s.id, 'name': s.name} for s in sections])
+    return jsonify([{'id': id, 'name': name} for id, name in section_choices(class_id)])
 
 @bp.route('/api/groups-for-class/<int:class_id>')
 def api_groups_for_class(class_id):
-    groups = Group.query.filter_by(class_id=class_id).all()
-    return jsonify([{'id': g.id, 'name': g.name} for g in groups])
+    return jsonify([{'id': id, 'name': name} for id, name in group_choices(class_id)])
 
 @bp.route('/api/subjects-for-class/<int:class_id>')
 def api_subjects_for_class(class_id):
-    subjects = Subject.query.filter_by(class_id=class_id).all()
-    return jsonify([{'id': s.id, 'name': s.name} for s in subjects])
+    return jsonify([{'id': id, 'name': name} for id, name in subject_choices(class_id)])
 
 @bp.route('/assignment/<int:id>/delete', methods=['POST'])
 @role_required('admin')
 @login_required
 def delete_assignment(id):
-    print("=" * 50)
-    print(f"DELETE ASSIGNMENT REQUEST - ID: {id}")
-    
-    # Check what assignment we're about to delete
-    assignment_to_delete = db.session.execute(
-        db.select(teacher_assignments).where(teacher_assignments.c.id == id)
-    ).first()
-    
-    if assignment_to_delete:
-        print(f"Assignment to delete:")
-        print(f"  ID: {assignment_to_delete.id}")
-        print(f"  Teacher ID: {assignment_to_delete.teacher_id}")
-        print(f"  Class ID: {assignment_to_delete.class_id}")
-        print(f"  Subject ID: {assignment_to_delete.subject_id}")
-        print(f"  Section ID: {assignment_to_delete.section_id}")
-        print(f"  Group ID: {assignment_to_delete.group_id}")
-    else:
-        print("WARNING: Assignment with ID {id} not found!")
-    
-    # Count before delete
-    count_before = db.session.execute(
-        db.select(func.count()).select_from(teacher_assignments)
-    ).scalar()
-    print(f"Assignments BEFORE delete: {count_before}")
-    
+    debugging = logger.isEnabledFor(logging.DEBUG)
+    if debugging:
+        count_before = _assignment_count()
+
     try:
         stmt = teacher_assignments.delete().where(teacher_assignments.c.id == id)
         result = db.session.execute(stmt)
+        bump_version()
+        invalidate_assignments()
         db.session.commit()
-        
-        # Count after delete
-        count_after = db.session.execute(
-            db.select(func.count()).select_from(teacher_assignments)
-        ).scalar()
-        print(f"Assignments AFTER delete: {count_after}")
-        print(f"Difference: {count_before - count_after} assignment(s) deleted")
-        
-        if count_before - count_after != 1:
-            print("WARNING: More than ONE assignment was deleted!")
+        if result.rowcount:
+            logger.info('Assignment deleted', extra={'assignment_id': id})
         else:
-            print("SUCCESS: Only ONE assignment deleted!")
-        print("=" * 50)
-        
+            logger.warning('Assignment to delete not found', extra={'assignment_id': id})
+        if debugging:
+            deleted = count_before - _assignment_count()
+            logger.log(logging.DEBUG if deleted <= 1 else logging.WARNING,
+                       'Assignment rows removed by one delete', extra={'rows_deleted': deleted})
+
         flash('Assignment deleted successfully.', 'success')
     except Exception as e:
-        print(f"ERROR deleting assignment: {str(e)}")
-        print("=" * 50)
         db.session.rollback()
+        logger.exception('Error deleting assignment', extra={'assignment_id': id})
         flash(f'Error deleting assignment: {str(e)}', 'danger')
-    return redirect(url_for('admin.assignments'))
\ No newline at end of file
+    return redirect(url_for('admin.assignments'))
@@ -1,48 +1,202 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, abort, Response, current_app
 from flask_login import login_required, current_user
-from app.models import Topic, TopicCompletion, Subject, teacher_assignments, db
+from app.models import Topic, TopicCompletion, db
 from app.utils import role_required
+from app.counters import apply_deltas
+from app.authz import authorize_topics
+from app.versioning import bump_version, current_version
+from app.progress import get_progress_tree
+from app.events import publish_progress, stream_progress
+from app.history import record_completions
 from datetime import date
 from sqlalchemy import select
 
 bp = Blueprint('api', __name__)
 
+MAX_BATCH_SIZE = 500
+
+def _upsert_insert(table):
+    # INSERT ... ON CONFLICT is dialect specific; both backends we run on support it
+    if db.session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
+
+def _apply_completions(teacher_id, updates):
+    """Apply {topic_id: is_completed} for one teacher in a single transaction.
+
+    Returns the topic ids the teacher is not assigned to; nothing is written
+    unless that list is empty.
+    """
+    # Authorization check against the cached assignment set; no ORM relationship walk
+    allowed, rejected = authorize_topics(teacher_id, updates)
+    if rejected:
+        return rejected
+
+    current = dict(db.session.execute(
+        select(TopicCompletion.topic_id, TopicCompletion.is_completed)
+        .where(TopicCompletion.topic_id.in_(updates))
+    ).all())
+
+    # Unticking a topic that was never ticked has nothing to write. Everything else
+    # goes through a conditional upsert, and only the rows it actually flipped come
+    # back, so two concurrent identical toggles are counted once.
+    rows = [
+        {'topic_id': topic_id, 'teacher_id': teacher_id,
+         'completion_date': date.today(), 'is_completed': is_completed}
+        for topic_id, is_completed in updates.items()
+        if is_completed or topic_id in current
+    ]
+    changed = []
+    if rows:
+        table = TopicCompletion.__table__
+        stmt = _upsert_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.topic_id],
+            set_={
+                'teacher_id': stmt.excluded.teacher_id,
+                'completion_date': stmt.excluded.completion_date,
+                'is_completed': stmt.excluded.is_completed
+            },
+            where=table.c.is_completed != stmt.excluded.is_completed
+        ).returning(table.c.topic_id, table.c.is_completed)
+        changed = db.session.execute(stmt, rows).all()
+
+    events = []
+    chapter_deltas = {}
+    for topic_id, is_completed in changed:
+        chapter_id, subject_id = allowed[topic_id]
+        events.append((topic_id, subject_id, is_completed))
+        _, completed = chapter_deltas.get(chapter_id, (0, 0))
+        chapter_deltas[chapter_id] = (0, completed + (1 if is_completed else -1))
+
+    if events:
+        apply_deltas(chapter_deltas)
+        record_completions(teacher_id, events)
+        bump_version()
+    db.session.commit()
+    if events:
+        publish_progress({subject_id for _, subject_id, _ in events})
+    return []
+
 @bp.route('/topic/<int:topic_id>', methods=['POST'])
 @role_required('teacher')
 @login_required
 def update_topic(topic_id):
-    topic = Topic.query.get_or_404(topic_id)
-    subject = topic.chapter.subject
-
-    # Authorization check: Is the current teacher assigned to this subject/class?
-    is_assigned = db.session.execute(
-        select(teacher_assignments).where(
-            teacher_assignments.c.teacher_id == current_user.id,
-            teacher_assignments.c.class_id == subject.class_id,
-            teacher_assignments.c.subject_id == subject.id
-        )
-    ).first() is not None
-
-    if not is_assigned:
+    data = request.get_json(silent=True)
+    is_completed = data.get('is_completed', False) if isinstance(data, dict) else None
+    if not isinstance(is_completed, bool):
+        return jsonify({'status': 'error', 'message': 'Expected a JSON object with a boolean is_completed.'}), 400
+
+    if _apply_completions(current_user.id, {topic_id: is_completed}):
+        if db.session.get(Topic, topic_id) is None:
+            abort(404)
         return jsonify({'status': 'error', 'message': 'You are not assigned to this subject'}), 403
 
-    data = request.get_json()
-    is_completed = data.get('is_completed', False)
+    return jsonify({'status': 'success', 'message': 'Topic updated successfully.'})
+
+@bp.route('/topics', methods=['POST'])
+@role_required('teacher')
+@login_required
+def update_topics():
+    # Body: {"updates": [{"topic_id": 1, "is_completed": true}, ...]}
+    data = request.get_json(silent=True)
+    items = data.get('updates') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'status': 'error', 'message': 'Expected a non-empty "updates" list.'}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({'status': 'error', 'message': f'At most {MAX_BATCH_SIZE} topics per request.'}), 400
+
+    updates = {}
+    for item in items:
+        try:
+            topic_id = int(item['topic_id'])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'Every update needs an integer topic_id.'}), 400
+        # Only a real JSON boolean counts; bool("false") would tick the topic
+        is_completed = item.get('is_completed', False)
+        if not isinstance(is_completed, bool):
+            return jsonify({'status': 'error', 'message': 'is_completed must be true or false.'}), 400
+        # Later entries for the same topic win, matching the order the checkboxes were clicked
+        updates[topic_id] = is_completed
+
+    rejected = _apply_completions(current_user.id, updates)
+    if rejected:
+        return jsonify({
+            'status': 'error',
+            'message': 'You are not assigned to the subject of some of these topics',
+            'topic_ids': rejected
+        }), 403
 
-    completion_record = TopicCompletion.query.filter_by(topic_id=topic_id).first()
-    if completion_record:
-        completion_record.is_completed = is_completed
-        completion_record.teacher_id = current_user.id
-        completion_record.completion_date = date.today() if is_completed else None
+    return jsonify({'status': 'success', 'message': f'{len(updates)} topic(s) updated successfully.'})
+
+def _versioned_json(build):
+    # Progress only changes when the data version is bumped, so the version is
+    # the ETag and a matching If-None-Match is answered before any query runs
+    etag = f'v{current_version()}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
     else:
-        if is_completed:
-            completion_record = TopicCompletion(
-                topic_id=topic_id,
-                teacher_id=current_user.id,
-                completion_date=date.today(),
-                is_completed=True
-            )
-            db.session.add(completion_record)
+        response = jsonify(build())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
-    db.session.commit()
-    return jsonify({'status': 'success', 'message': 'Topic updated successfully.'})
\ No newline at end of file
+def _node_json(node, **extra):
+    return dict(id=node.id, name=node.name, progress=node.progress,
+                total_topics=node.total, completed_topics=node.completed, **extra)
+
+@bp.route('/progress/classes')
+@role_required('principal')
+@login_required
+def class_progress():
+    def build():
+        tree = get_progress_tree()
+        return {
+            'overall': _node_json(tree.overall),
+            'classes': [_node_json(cls) for cls in tree.overall.children]
+        }
+    return _versioned_json(build)
+
+@bp.route('/progress/subjects')
+@role_required('principal')
+@login_required
+def subject_progress():
+    # Optional ?class_id= narrows to one class
+    class_id = request.args.get('class_id', type=int)
+
+    def build():
+        tree = get_progress_tree()
+        classes = tree.overall.children if class_id is None else [tree.classes[class_id]] if class_id in tree.classes else []
+        return {'subjects': [_node_json(subject, class_id=cls.id, class_name=cls.name)
+                             for cls in classes for subject in cls.children]}
+    return _versioned_json(build)
+
+@bp.route('/progress/chapters')
+@role_required('principal')
+@login_required
+def chapter_progress():
+    subject_id = request.args.get('subject_id', type=int)
+    if subject_id is None:
+        return jsonify({'status': 'error', 'message': 'subject_id is required.'}), 400
+
+    def build():
+        subject = get_progress_tree(chapters=True).subjects.get(subject_id)
+        if subject is None:
+            abort(404)
+        return {'subject': _node_json(subject), 'chapters': [_node_json(chapter) for chapter in subject.children]}
+    return _versioned_json(build)
+
+@bp.route('/progress/stream')
+@role_required('principal')
+@login_required
+def progress_stream():
+    # Server-sent events: 'progress' carries the new counters after a topic update,
+    # 'refresh' asks the client to refetch the JSON endpoints above
+    response = Response(stream_progress(current_app._get_current_object(), request.headers.get('Last-Event-ID')),
+                        mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
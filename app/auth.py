@@ -1,9 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, current_user
-from app import db
 from app.models import User
 from app.forms import LoginForm
-from datetime import datetime
+from app.activity import record_login
 
 bp = Blueprint('auth', __name__)
 
@@ -25,8 +24,7 @@ def login():
             flash('Invalid username or password', 'danger')
             return redirect(url_for('auth.login'))
         login_user(user, remember=form.remember_me.data)
-        user.updated_at = datetime.utcnow()
-        db.session.commit()
+        record_login(user.id, request.remote_addr)
         next_page = request.args.get('next')
         if not next_page or not next_page.startswith('/'):
             if user.role == 'admin':
@@ -0,0 +1,79 @@
+import threading
+import time
+from flask import current_app
+from app.models import Topic, Chapter, Subject, teacher_assignments, db
+from app.versioning import bump_version, current_version
+
+# Process-wide snapshot of who may edit what. It is tied to the 'assignments'
+# data version, so invalidate_assignments() inside the transaction that changes
+# an assignment makes every worker rebuild it once that commits. It is also
+# rebuilt once AUTHZ_CACHE_TTL seconds have passed.
+ASSIGNMENTS = 'assignments'
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+class _AuthzSnapshot:
+    def __init__(self, version):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.teacher_pairs = {}   # teacher_id -> {(class_id, subject_id)}
+        self.topics = {}          # topic_id -> (chapter_id, class_id, subject_id)
+
+    def load(self):
+        for teacher_id, class_id, subject_id in db.session.execute(
+            db.select(teacher_assignments.c.teacher_id, teacher_assignments.c.class_id,
+                      teacher_assignments.c.subject_id).distinct()
+        ):
+            self.teacher_pairs.setdefault(teacher_id, set()).add((class_id, subject_id))
+        self.add_topics()
+        return self
+
+    def add_topics(self, topic_ids=None):
+        statement = db.select(Topic.id, Topic.chapter_id, Subject.class_id, Subject.id)\
+            .join(Chapter, Topic.chapter_id == Chapter.id)\
+            .join(Subject, Chapter.subject_id == Subject.id)
+        if topic_ids is not None:
+            statement = statement.where(Topic.id.in_(topic_ids))
+        for topic_id, chapter_id, class_id, subject_id in db.session.execute(statement):
+            self.topics[topic_id] = (chapter_id, class_id, subject_id)
+
+
+def _get_snapshot():
+    global _snapshot
+    ttl = current_app.config.get('AUTHZ_CACHE_TTL', 300)
+    version = current_version(ASSIGNMENTS)
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version or time.monotonic() - snapshot.built_at > ttl:
+        with _lock:
+            if _snapshot is snapshot:
+                _snapshot = _AuthzSnapshot(version).load()
+            snapshot = _snapshot
+    return snapshot
+
+
+def invalidate_assignments():
+    # Call inside the transaction that changes teacher_assignments
+    bump_version(ASSIGNMENTS)
+
+
+def authorize_topics(teacher_id, topic_ids):
+    """Split topic_ids into ({topic_id: (chapter_id, subject_id)} the teacher may edit, [rejected ids])."""
+    snapshot = _get_snapshot()
+
+    # Topics created since the snapshot was built are looked up once and remembered
+    missing = [topic_id for topic_id in topic_ids if topic_id not in snapshot.topics]
+    if missing:
+        with _lock:
+            snapshot.add_topics(missing)
+
+    pairs = snapshot.teacher_pairs.get(teacher_id, set())
+    allowed, rejected = {}, []
+    for topic_id in topic_ids:
+        chapter_id, class_id, subject_id = snapshot.topics.get(topic_id, (None, None, None))
+        if (class_id, subject_id) in pairs:
+            allowed[topic_id] = (chapter_id, subject_id)
+        else:
+            rejected.append(topic_id)
+    return allowed, rejected
@@ -0,0 +1,62 @@
+from flask import current_app
+from app.cache import TTLCache
+from app.models import User, Class, Section, Group, Subject, Chapter, db
+from app.versioning import bump_version, current_version
+
+# Dropdown choice lists for the admin forms. Entries are keyed by the 'choices'
+# data version, so invalidate_choices() inside a create/edit transaction makes
+# every worker rebuild them once it commits.
+CHOICES = 'choices'
+
+_cache = TTLCache(maxsize=256, ttl=300)
+
+
+def invalidate_choices():
+    bump_version(CHOICES)
+
+
+def _cached(key, build):
+    key = (key, current_version(CHOICES))
+    choices = _cache.get(key)
+    if choices is None:
+        choices = [tuple(row) for row in db.session.execute(build())]
+        _cache.set(key, choices, ttl=current_app.config.get('CHOICE_CACHE_TTL', 300))
+    return choices
+
+
+def teacher_choices():
+    return _cached('teachers', lambda: db.select(User.id, User.full_name)
+                   .where(User.role == 'teacher').order_by(User.full_name))
+
+
+def class_choices():
+    return _cached('classes', lambda: db.select(Class.id, Class.name).order_by(Class.name))
+
+
+def subject_choices(class_id):
+    return _cached(('subjects', class_id), lambda: db.select(Subject.id, Subject.name)
+                   .where(Subject.class_id == class_id).order_by(Subject.id))
+
+
+def section_choices(class_id):
+    return _cached(('sections', class_id), lambda: db.select(Section.id, Section.name)
+                   .where(Section.class_id == class_id).order_by(Section.id))
+
+
+def group_choices(class_id):
+    return _cached(('groups', class_id), lambda: db.select(Group.id, Group.name)
+                   .where(Group.class_id == class_id).order_by(Group.id))
+
+
+def subject_label_choices():
+    # "Subject (Class)" for every subject in one joined query
+    return _cached('subject_labels', lambda: db.select(Subject.id, Subject.name + ' (' + Class.name + ')')
+                   .join(Class, Subject.class_id == Class.id).order_by(Subject.name))
+
+
+def chapter_label_choices():
+    # "Class > Subject > Chapter" for every chapter in one joined query
+    return _cached('chapter_labels', lambda: db.select(Chapter.id, Class.name + ' > ' + Subject.name + ' > ' + Chapter.name)
+                   .join(Subject, Chapter.subject_id == Subject.id)
+                   .join(Class, Subject.class_id == Class.id)
+                   .order_by(Class.name, Subject.name, Chapter.name))
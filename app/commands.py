@@ -0,0 +1,138 @@
+import click
+from flask.cli import AppGroup
+
+progress_cli = AppGroup('progress', help='Maintain the materialized progress counters.')
+
+
+def _print_drift(drift):
+    for scope, entity_id, stored, expected in drift:
+        click.echo(f"  {scope} {entity_id}: stored {stored[1]}/{stored[0]}, expected {expected[1]}/{expected[0]}")
+
+
+@progress_cli.command('verify')
+def verify_counters():
+    """Recount topics and report counters that have drifted."""
+    from app.counters import find_drift
+    drift = find_drift()
+    if not drift:
+        click.echo('Progress counters are consistent.')
+        return
+    click.echo(f'{len(drift)} counter(s) have drifted:')
+    _print_drift(drift)
+    raise SystemExit(1)
+
+
+@progress_cli.command('rebuild')
+def rebuild_counters():
+    """Recompute every progress counter from the topics table."""
+    from app.counters import rebuild_counters
+    drift = rebuild_counters()
+    if drift:
+        click.echo(f'Fixed {len(drift)} drifted counter(s):')
+        _print_drift(drift)
+    click.echo('Progress counters rebuilt.')
+
+
+@progress_cli.command('rollup')
+def rebuild_rollup():
+    """Recompute the daily progress rollup from the completion event log."""
+    from app.history import rebuild_rollups
+    click.echo(f'Daily progress rebuilt: {rebuild_rollups()} row(s).')
+
+
+@progress_cli.command('changes')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), help='Compare with the last snapshot before this date (default: the latest).')
+def progress_changes(since):
+    """Show topics completed since a stored progress snapshot, per class and teacher."""
+    from datetime import date, timedelta
+    from app.progress import build_progress_tree
+    from app.snapshots import previous_snapshot, completions_since, summarize_completions
+    snapshot = previous_snapshot(since.date() if since else date.today() + timedelta(days=1))
+    if snapshot is None:
+        raise click.ClickException('No progress snapshot has been stored yet.')
+    tree = build_progress_tree()
+    changes = summarize_completions(completions_since(snapshot.created_at), tree)
+    click.echo(f"{changes['completed']} topic(s) completed since {snapshot.snapshot_date.isoformat()}")
+    if changes['classes']:
+        click.echo('By class:')
+    for cls in changes['classes']:
+        click.echo(f"  {cls['name']}: {cls['completed']}")
+    if changes['teachers']:
+        click.echo('By teacher:')
+    for teacher in changes['teachers']:
+        click.echo(f"  {teacher['name']}: {teacher['completed']}")
+
+
+syllabus_cli = AppGroup('syllabus', help='Bulk syllabus maintenance.')
+
+
+@syllabus_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--dry-run', is_flag=True, help='Check the file and report what would be created without saving.')
+def import_syllabus_command(path, dry_run):
+    """Import subjects, chapters and topics from a CSV or XLSX file.
+
+    The first row must name the columns class, subject, chapter and (optionally) topic.
+    """
+    from app.importer import import_syllabus, read_rows
+    with open(path, 'rb') as fileobj:
+        try:
+            result = import_syllabus(read_rows(fileobj, path), dry_run=dry_run)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    prefix = 'Would create' if dry_run else 'Created'
+    click.echo(f'{prefix} {result.subjects} subject(s), {result.chapters} chapter(s), {result.topics} topic(s); '
+               f'{result.skipped} existing topic(s) skipped.')
+    if result.errors:
+        click.echo(f'{len(result.errors)} row(s) had errors:')
+        for line, message in result.errors:
+            click.echo(f'  line {line}: {message}')
+        raise SystemExit(1)
+
+
+digest_cli = AppGroup('digest', help='Daily progress digest for principals.')
+
+
+@digest_cli.command('send')
+@click.option('--date', 'report_date', type=click.DateTime(formats=['%Y-%m-%d']), help='Report date (default: today).')
+@click.option('--force', is_flag=True, help='Send again to principals who already received this date.')
+def send_digest(report_date, force):
+    """Email the daily progress digest to every active principal.
+
+    Run it once a day from cron, e.g. `0 18 * * * flask --app run digest send`.
+    To try it locally, start `python -m aiosmtpd -n -l localhost:8025` and set
+    MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_USE_TLS=false.
+    """
+    from app.digest import send_digests
+    sent, failed = send_digests(report_date.date() if report_date else None, force)
+    click.echo(f'Sent {len(sent)} digest(s).')
+    if failed:
+        click.echo(f'{len(failed)} digest(s) failed:')
+        for email, error in failed:
+            click.echo(f'  {email}: {error}')
+        raise SystemExit(1)
+
+
+@click.command('explain-indexes')
+@click.option('--repeat', default=10, show_default=True, help='Timed runs per query.')
+def explain_indexes_command(repeat):
+    """Show EXPLAIN QUERY PLAN and timings for the hot queries with and without indexes."""
+    from app import db
+    from app.index_bench import explain_indexes
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('explain-indexes only supports SQLite databases.')
+    for label, plan, ms, bare_plan, bare_ms in explain_indexes(repeat):
+        click.echo(f'== {label}')
+        click.echo(f'  without indexes ({bare_ms:.2f} ms):')
+        for step in bare_plan:
+            click.echo(f'    {step}')
+        click.echo(f'  with indexes ({ms:.2f} ms):')
+        for step in plan:
+            click.echo(f'    {step}')
+
+
+def register_commands(app):
+    app.cli.add_command(progress_cli)
+    app.cli.add_command(digest_cli)
+    app.cli.add_command(syllabus_cli)
+    app.cli.add_command(explain_indexes_command)
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from app.models import ProgressCounter, Chapter, Subject, db
+from app.progress import build_progress_tree, OVERALL_ID
+from app.versioning import bump_version
+
+
+def apply_deltas(chapter_deltas):
+    # chapter_deltas maps chapter_id -> (total_delta, completed_delta). The chapter,
+    # its subject, its class and the overall row are all adjusted inside the
+    # caller's transaction; the caller commits.
+    chapter_deltas = {k: v for k, v in chapter_deltas.items() if v != (0, 0)}
+    if not chapter_deltas:
+        return
+
+    parents = db.session.execute(
+        db.select(Chapter.id, Chapter.subject_id, Subject.class_id)
+        .join(Subject, Chapter.subject_id == Subject.id)
+        .where(Chapter.id.in_(chapter_deltas))
+    ).all()
+
+    deltas = defaultdict(lambda: [0, 0])
+    for chapter_id, subject_id, class_id in parents:
+        total, completed = chapter_deltas[chapter_id]
+        for key in (('chapter', chapter_id), ('subject', subject_id), ('class', class_id), ('overall', OVERALL_ID)):
+            deltas[key][0] += total
+            deltas[key][1] += completed
+
+    table = ProgressCounter.__table__
+    for (scope, entity_id), (total, completed) in deltas.items():
+        result = db.session.execute(
+            table.update()
+            .where(table.c.scope == scope, table.c.entity_id == entity_id)
+            .values(total_topics=table.c.total_topics + total,
+                    completed_topics=table.c.completed_topics + completed)
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(
+                scope=scope, entity_id=entity_id, total_topics=total, completed_topics=completed
+            ))
+
+
+def adjust_counters(chapter_id, total=0, completed=0):
+    apply_deltas({chapter_id: (total, completed)})
+
+
+def get_counter(scope, entity_id=OVERALL_ID):
+    counter = db.session.get(ProgressCounter, (scope, entity_id))
+    if counter is None:
+        return 0, 0
+    return counter.total_topics, counter.completed_topics
+
+
+def expected_counters():
+    tree = build_progress_tree(recount=True)
+    expected = {('overall', OVERALL_ID): (tree.overall.total, tree.overall.completed)}
+    for scope, nodes in (('class', tree.classes), ('subject', tree.subjects), ('chapter', tree.chapters)):
+        for entity_id, node in nodes.items():
+            expected[(scope, entity_id)] = (node.total, node.completed)
+    return expected
+
+
+def find_drift(expected=None):
+    # Returns [(scope, entity_id, stored, expected)] for every counter that disagrees with a recount
+    if expected is None:
+        expected = expected_counters()
+    stored = {
+        (c.scope, c.entity_id): (c.total_topics, c.completed_topics)
+        for c in ProgressCounter.query.all()
+    }
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, (0, 0))
+        have = stored.get(key, (0, 0))
+        if want != have:
+            drift.append((key[0], key[1], have, want))
+    return drift
+
+
+def rebuild_counters():
+    # Recompute every counter from scratch in one transaction, returning the drift that was fixed
+    expected = expected_counters()
+    drift = find_drift(expected)
+    rows = [
+        {'scope': scope, 'entity_id': entity_id, 'total_topics': total, 'completed_topics': completed}
+        for (scope, entity_id), (total, completed) in expected.items()
+    ]
+    db.session.execute(ProgressCounter.__table__.delete())
+    if rows:
+        db.session.execute(ProgressCounter.__table__.insert(), rows)
+    # Cached reports and ETags are keyed on the version, not on the counters themselves
+    bump_version()
+    db.session.commit()
+    return drift
@@ -0,0 +1,153 @@
+import smtplib
+import time
+from collections import Counter
+from datetime import date, datetime
+from flask import current_app, render_template
+from flask_mail import Message
+from app import mail
+from app.models import User, EmailReport, db
+from app.progress import build_progress_tree
+from app.snapshots import subject_counts, previous_snapshot, save_snapshot, completions_since, summarize_completions
+
+# Failures worth reconnecting for; anything else (e.g. a refused recipient) fails that message only
+RETRYABLE_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, smtplib.SMTPHeloError, OSError)
+
+
+def build_digest(report_date):
+    """Return (digest, counts): progress per class and subject plus what changed since the last digest.
+
+    The change set is read from the completion events logged since the previous
+    snapshot was taken, so it only counts topics newly ticked and credits the
+    teacher who ticked them.
+    """
+    tree = build_progress_tree()
+    counts = subject_counts(tree)
+    previous = previous_snapshot(report_date)
+    completions = completions_since(previous.created_at if previous else None)
+    changes = summarize_completions(completions, tree)
+    per_subject = Counter(subject_id for subject_id, _ in completions.values())
+
+    classes = []
+    for cls in tree.overall.children:
+        subjects = [{
+            'name': subject.name,
+            'total_topics': subject.total,
+            'completed_topics': subject.completed,
+            'progress': subject.progress,
+            'completed_since': per_subject[subject.id]
+        } for subject in cls.children]
+        classes.append({
+            'name': cls.name,
+            'total_topics': cls.total,
+            'completed_topics': cls.completed,
+            'progress': cls.progress,
+            'completed_since': sum(subject['completed_since'] for subject in subjects),
+            'subjects': subjects
+        })
+
+    digest = {
+        'report_date': report_date.isoformat(),
+        'since': previous.snapshot_date.isoformat() if previous else None,
+        'total_topics': tree.overall.total,
+        'completed_topics': tree.overall.completed,
+        'progress': tree.overall.progress,
+        'changes': changes,
+        'classes': classes
+    }
+    return digest, counts
+
+
+def _digest_message(principal, digest):
+    return Message(
+        subject=f"Syllabus progress for {digest['report_date']}: {digest['progress']}% complete",
+        recipients=[principal.email],
+        body=render_template('email/digest.txt', principal=principal, report=digest),
+        html=render_template('email/digest.html', principal=principal, report=digest)
+    )
+
+
+class _Sender:
+    """One SMTP connection reused for every message, reopened with backoff when it drops."""
+
+    def __init__(self, max_retries, backoff):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.connection = None
+
+    def _open(self):
+        self.connection = mail.connect()
+        self.connection.__enter__()
+
+    def close(self):
+        if self.connection is not None and self.connection.host is not None:
+            try:
+                self.connection.host.quit()
+            except (smtplib.SMTPException, OSError):
+                # Already broken: just drop the socket
+                self.connection.host.close()
+        self.connection = None
+
+    def send(self, message):
+        attempt = 0
+        while True:
+            try:
+                if self.connection is None:
+                    self._open()
+                self.connection.send(message)
+                return
+            except RETRYABLE_ERRORS:
+                self.close()
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+            except smtplib.SMTPResponseException as e:
+                # 4xx replies are temporary: wait and try again on the same connection
+                if not 400 <= e.smtp_code < 500 or attempt >= self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+
+
+def send_digests(report_date=None, force=False):
+    """Store and email the daily digest to every active principal.
+
+    Principals who already have a digest for report_date are skipped unless
+    force is set. Returns (sent, failed) where failed is [(email, error)].
+    """
+    report_date = report_date or date.today()
+    principals = User.query.filter(User.role == 'principal', User.is_active == True).all()
+    if not force:
+        already_sent = set(db.session.execute(
+            db.select(EmailReport.principal_id).where(EmailReport.report_date == report_date)
+        ).scalars())
+        principals = [principal for principal in principals if principal.id not in already_sent]
+    if not principals:
+        return [], []
+
+    digest, counts = build_digest(report_date)
+    # EmailReport keeps the totals and the change set; per-subject detail lives in the packed snapshot
+    stored = {key: value for key, value in digest.items() if key != 'classes'}
+    sender = _Sender(current_app.config.get('DIGEST_MAX_RETRIES', 3),
+                     current_app.config.get('DIGEST_RETRY_BACKOFF', 1.0))
+    sent, failed, rows = [], [], []
+    try:
+        for principal in principals:
+            try:
+                sender.send(_digest_message(principal, digest))
+            except (smtplib.SMTPException, OSError) as e:
+                current_app.logger.warning('Digest to %s failed: %s', principal.email, e)
+                failed.append((principal.email, str(e)))
+                continue
+            sent.append(principal.email)
+            report = EmailReport(principal_id=principal.id, report_date=report_date, sent_at=datetime.utcnow())
+            report.set_data(stored)
+            rows.append(report)
+    finally:
+        sender.close()
+        # Record what went out even if a later message raised something unexpected
+        db.session.add_all(rows)
+        if rows:
+            save_snapshot(report_date, counts)
+        db.session.commit()
+    return sent, failed
@@ -0,0 +1,142 @@
+import json
+import queue
+import threading
+import time
+from sqlalchemy import or_, and_
+from app.models import ProgressCounter, Subject, db
+from app.versioning import current_version
+
+# One in-process fan-out for live progress: a write publishes a single message
+# and every open stream in this worker gets it from its own queue. Streams in
+# other workers notice the write through the data version on their next
+# heartbeat and tell their clients to refetch.
+
+
+class Broadcaster:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, event, data):
+        message = (event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # A stalled client gets a full refresh instead of a backlog
+                self._reset(subscriber)
+
+    def _reset(self, subscriber):
+        # Serialized so two publishers can't both drain and refill the same queue;
+        # a publish landing between the drain and the put just means draining again
+        with self._lock:
+            while True:
+                while True:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        break
+                try:
+                    subscriber.put_nowait(('refresh', {}))
+                    return
+                except queue.Full:
+                    continue
+
+
+broadcaster = Broadcaster()
+
+SCOPE_KEYS = {'class': 'classes', 'subject': 'subjects'}
+
+
+def _counter_json(counter):
+    total, completed = counter.total_topics, counter.completed_topics
+    return {
+        'id': counter.entity_id,
+        'total_topics': total,
+        'completed_topics': completed,
+        'progress': round(completed / total * 100) if total else 0
+    }
+
+
+def publish_progress(subject_ids):
+    """Push the new counters for these subjects, their classes and the overall total. Call after commit."""
+    if not subject_ids or not broadcaster.has_subscribers():
+        return
+    class_ids = db.select(Subject.class_id).where(Subject.id.in_(subject_ids)).scalar_subquery()
+    counters = ProgressCounter.query.filter(or_(
+        and_(ProgressCounter.scope == 'subject', ProgressCounter.entity_id.in_(subject_ids)),
+        and_(ProgressCounter.scope == 'class', ProgressCounter.entity_id.in_(class_ids)),
+        ProgressCounter.scope == 'overall'
+    )).all()
+
+    message = {'version': current_version(), 'overall': None, 'classes': [], 'subjects': []}
+    for counter in counters:
+        if counter.scope == 'overall':
+            message['overall'] = _counter_json(counter)
+        else:
+            message[SCOPE_KEYS[counter.scope]].append(_counter_json(counter))
+    broadcaster.publish('progress', message)
+
+
+def _format(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
+
+
+def stream_progress(app, last_event_id=None):
+    """Yield server-sent events until the client goes away or SSE_STREAM_TIMEOUT passes.
+
+    Each open stream holds one worker thread (or greenlet), so run gunicorn
+    with a threaded (gthread) or async (gevent) worker. Browsers reconnect on
+    their own once a stream ends, sending the last version they saw as
+    last_event_id; anything written in between is caught up with a refresh.
+    """
+    heartbeat = app.config.get('SSE_HEARTBEAT', 15)
+    deadline = time.monotonic() + app.config.get('SSE_STREAM_TIMEOUT', 300)
+    with app.app_context():
+        version = current_version()
+        db.session.remove()
+
+    subscriber = broadcaster.subscribe()
+    try:
+        # The id gives the browser a baseline to send back even if no event follows
+        yield f'retry: 3000\nid: {version}\n\n'
+        if last_event_id is not None and last_event_id != str(version):
+            yield _format('refresh', {'version': version}, version)
+        while time.monotonic() < deadline:
+            try:
+                event, data = subscriber.get(timeout=heartbeat)
+            except queue.Empty:
+                # Catch writes made by other workers, or that did not publish
+                with app.app_context():
+                    latest = current_version()
+                    db.session.remove()
+                if latest != version:
+                    version = latest
+                    yield _format('refresh', {'version': version}, version)
+                else:
+                    yield ': keepalive\n\n'
+                continue
+            version = data.get('version', version)
+            yield _format(event, data, version)
+    finally:
+        broadcaster.unsubscribe(subscriber)
@@ -0,0 +1,94 @@
+from datetime import date
+from functools import lru_cache
+from itertools import groupby
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+EXCEL_HEADERS = ['Teacher', 'Class', 'Subject', 'Total Topics', 'Completed Topics', 'Progress %']
+
+PDF_HEADERS = ['Teacher', 'Subject', 'Completed', 'Total', 'Progress']
+PDF_COLUMN_WIDTHS = [60 * mm, 55 * mm, 22 * mm, 18 * mm, 22 * mm]
+# Long classes are split into several tables; Platypus splits huge tables slowly
+PDF_ROWS_PER_TABLE = 200
+
+
+def write_excel(rows, fileobj):
+    # write_only mode streams each row to a temporary sheet file instead of
+    # building the whole worksheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Progress Report')
+    header = []
+    for title in EXCEL_HEADERS:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    for row in rows:
+        sheet.append([
+            row.teacher_name,
+            row.class_name,
+            row.subject_name,
+            row.total_topics,
+            row.completed_topics,
+            f"{round(row.completed_topics / row.total_topics * 100, 1)}%"
+        ])
+    workbook.save(fileobj)
+
+
+@lru_cache(maxsize=None)
+def _pdf_styles():
+    # Built once per process and shared by every PDF request
+    sample = getSampleStyleSheet()
+    table_style = TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#212529')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')]),
+        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#adb5bd')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    return {'heading': sample['Heading2'], 'normal': sample['Normal'], 'table': table_style}
+
+
+def _draw_page_header(canvas, doc):
+    width, height = A4
+    canvas.saveState()
+    canvas.setFont('Helvetica-Bold', 12)
+    canvas.drawString(doc.leftMargin, height - 15 * mm, doc.title)
+    canvas.setFont('Helvetica', 8)
+    canvas.drawRightString(width - doc.rightMargin, height - 15 * mm, f"Generated {date.today():%d %b %Y}")
+    canvas.drawRightString(width - doc.rightMargin, 10 * mm, f"Page {doc.page}")
+    canvas.restoreState()
+
+
+def write_pdf(rows, fileobj, title='Syllabus Progress Report'):
+    # rows must arrive ordered by class; each class gets its own heading and table
+    styles = _pdf_styles()
+    doc = SimpleDocTemplate(fileobj, pagesize=A4, title=title,
+                            topMargin=25 * mm, bottomMargin=18 * mm,
+                            leftMargin=15 * mm, rightMargin=15 * mm)
+    story = []
+    for class_name, class_rows in groupby(rows, key=lambda row: row.class_name):
+        story.append(Paragraph(class_name, styles['heading']))
+        data = [PDF_HEADERS]
+        for row in class_rows:
+            data.append([row.teacher_name, row.subject_name, row.completed_topics,
+                         row.total_topics, f"{row.progress}%"])
+            if len(data) > PDF_ROWS_PER_TABLE:
+                story.append(Table(data, colWidths=PDF_COLUMN_WIDTHS, style=styles['table'], repeatRows=1))
+                data = [PDF_HEADERS]
+        if len(data) > 1:
+            story.append(Table(data, colWidths=PDF_COLUMN_WIDTHS, style=styles['table'], repeatRows=1))
+        story.append(Spacer(1, 6 * mm))
+    if not story:
+        story.append(Paragraph('No assignments with topics to report.', styles['normal']))
+    doc.build(story, onFirstPage=_draw_page_header, onLaterPages=_draw_page_header)
@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import StringField, PasswordField, BooleanField, SubmitField, SelectField, DateField
 from wtforms.validators import DataRequired, Email, EqualTo, ValidationError
 from app.models import User
@@ -45,6 +46,11 @@ class TopicForm(FlaskForm):
     chapter_id = SelectField('Chapter', coerce=int, validators=[DataRequired()])
     submit = SubmitField('Save Topic')
 
+class SyllabusImportForm(FlaskForm):
+    file = FileField('Syllabus File (CSV or XLSX)', validators=[FileRequired(), FileAllowed(['csv', 'xlsx'], 'CSV or XLSX files only.')])
+    dry_run = BooleanField('Check only (do not save)')
+    submit = SubmitField('Import')
+
 def coerce_int_or_none(value):
     """Coerce value to int or None if empty/None"""
     if value is None or value == '':
@@ -0,0 +1,131 @@
+import math
+from collections import Counter
+from datetime import date, timedelta
+from flask import current_app
+from sqlalchemy import func
+from app.models import CompletionEvent, DailyProgress, Subject, db
+from app.counters import get_counter
+from app.versioning import bump_version
+
+
+def record_completions(teacher_id, changes, day=None):
+    """Append events for [(topic_id, subject_id, is_completed)] and fold them into the daily rollup.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    if not changes:
+        return
+    day = day or date.today()
+    db.session.execute(CompletionEvent.__table__.insert(), [{
+        'topic_id': topic_id,
+        'subject_id': subject_id,
+        'teacher_id': teacher_id,
+        'is_completed': is_completed,
+        'occurred_on': day
+    } for topic_id, subject_id, is_completed in changes])
+
+    counts = Counter()
+    for _, subject_id, is_completed in changes:
+        counts[(subject_id, is_completed)] += 1
+
+    table = DailyProgress.__table__
+    for subject_id in {subject_id for _, subject_id, _ in changes}:
+        completed, uncompleted = counts[(subject_id, True)], counts[(subject_id, False)]
+        result = db.session.execute(
+            table.update()
+            .where(table.c.day == day, table.c.subject_id == subject_id)
+            .values(completed=table.c.completed + completed,
+                    uncompleted=table.c.uncompleted + uncompleted)
+        )
+        if result.rowcount == 0:
+            db.session.execute(table.insert().values(
+                day=day, subject_id=subject_id, completed=completed, uncompleted=uncompleted
+            ))
+
+
+def rebuild_rollups():
+    """Recompute daily_progress from the event log. Returns the number of rollup rows."""
+    table = DailyProgress.__table__
+    db.session.execute(table.delete())
+    db.session.execute(table.insert().from_select(
+        ['day', 'subject_id', 'completed', 'uncompleted'],
+        db.select(
+            CompletionEvent.occurred_on, CompletionEvent.subject_id,
+            func.sum(db.case((CompletionEvent.is_completed == True, 1), else_=0)),
+            func.sum(db.case((CompletionEvent.is_completed == True, 0), else_=1))
+        ).group_by(CompletionEvent.occurred_on, CompletionEvent.subject_id)
+    ))
+    bump_version()
+    db.session.commit()
+    return db.session.scalar(db.select(func.count()).select_from(table))
+
+
+def _daily_net(scope, entity_id, start):
+    statement = db.select(
+        DailyProgress.day, func.sum(DailyProgress.completed) - func.sum(DailyProgress.uncompleted)
+    ).where(DailyProgress.day >= start).group_by(DailyProgress.day)
+    if scope == 'class':
+        statement = statement.join(Subject, DailyProgress.subject_id == Subject.id)\
+            .where(Subject.class_id == entity_id)
+    else:
+        statement = statement.where(DailyProgress.subject_id == entity_id)
+    return dict(db.session.execute(statement).all())
+
+
+def burndown(scope, entity_id, days=30, today=None):
+    """Remaining topics and net completions per day for a class or subject, with a pace projection.
+
+    The remaining series is anchored on the current progress counters and walked
+    backwards through the rollups, so completions made before the event log existed
+    still count.
+    """
+    today = today or date.today()
+    window = current_app.config.get('PROGRESS_VELOCITY_WINDOW', 14)
+    start = today - timedelta(days=max(days, window) - 1)
+    net = _daily_net(scope, entity_id, start)
+    total, completed = get_counter(scope, entity_id)
+
+    labels, remaining, velocity = [], [], []
+    left = total - completed
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        labels.append(day.isoformat())
+        remaining.append(left)
+        velocity.append(net.get(day, 0))
+        left += net.get(day, 0)
+    labels.reverse()
+    remaining.reverse()
+    velocity.reverse()
+
+    pace = sum(net.get(today - timedelta(days=offset), 0) for offset in range(window)) / window
+    remaining_now = total - completed
+    projected_end = None
+    if remaining_now == 0:
+        projected_end = today
+    elif pace > 0:
+        projected_end = today + timedelta(days=math.ceil(remaining_now / pace))
+
+    term_end = current_app.config.get('TERM_END_DATE')
+    required_pace = on_track = None
+    if term_end:
+        days_left = (term_end - today).days
+        required_pace = round(remaining_now / days_left, 2) if days_left > 0 else None
+        on_track = projected_end is not None and projected_end <= term_end
+
+    return {
+        'scope': scope,
+        'entity_id': entity_id,
+        'total_topics': total,
+        'completed_topics': completed,
+        'labels': labels,
+        'remaining': remaining,
+        'velocity': velocity,
+        'projection': {
+            'pace': round(pace, 2),
+            'window_days': window,
+            'projected_end': projected_end.isoformat() if projected_end else None,
+            'term_end': term_end.isoformat() if term_end else None,
+            'required_pace': required_pace,
+            'on_track': on_track
+        }
+    }
@@ -0,0 +1,148 @@
+import csv
+import io
+import zipfile
+from collections import defaultdict
+from typing import NamedTuple
+from app.models import Class, Subject, Chapter, Topic, db
+from app.counters import apply_deltas
+from app.versioning import bump_version
+from app.choices import invalidate_choices
+
+# Columns, matched case-insensitively on the header row; a row without a topic
+# only creates its subject and chapter.
+COLUMNS = ('class', 'subject', 'chapter', 'topic')
+BATCH_SIZE = 1000
+
+
+class ImportResult(NamedTuple):
+    subjects: int
+    chapters: int
+    topics: int
+    skipped: int
+    errors: list  # [(line number, message)]
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    for row in csv.reader(text):
+        yield row
+
+
+def _xlsx_rows(fileobj):
+    from xml.etree.ElementTree import ParseError
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+    # Callers report ValueError to the user, so a damaged file becomes one too
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, ParseError) as e:
+        raise ValueError(f'Not a readable .xlsx file: {e}') from e
+    try:
+        if not workbook.worksheets:
+            raise ValueError('The workbook has no worksheets.')
+        try:
+            for row in workbook.worksheets[0].iter_rows(values_only=True):
+                yield ['' if value is None else str(value) for value in row]
+        except (zipfile.BadZipFile, KeyError, ParseError) as e:
+            raise ValueError(f'Not a readable .xlsx file: {e}') from e
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """Yield (line number, {column: value}) from a CSV or XLSX file with a header row."""
+    rows = _xlsx_rows(fileobj) if filename.lower().endswith('.xlsx') else _csv_rows(fileobj)
+    header = None
+    for line, row in enumerate(rows, start=1):
+        if header is None:
+            header = [cell.strip().lower() for cell in row]
+            missing = [column for column in COLUMNS[:3] if column not in header]
+            if missing:
+                raise ValueError(f"Missing column(s): {', '.join(missing)}")
+            continue
+        values = {column: row[index].strip() if index < len(row) else ''
+                  for index, column in enumerate(header) if column in COLUMNS}
+        if any(values.values()):
+            yield line, values
+
+
+def import_syllabus(rows, dry_run=False):
+    """Import (line, {class, subject, chapter, topic}) rows in a single transaction.
+
+    Classes must already exist; missing subjects and chapters are created and
+    topics are inserted in executemany batches. Topics that already exist in
+    their chapter are skipped, and bad rows are reported without stopping the import.
+    """
+    classes = {name.lower(): class_id for class_id, name in db.session.execute(db.select(Class.id, Class.name))}
+    subjects = {(class_id, name.lower()): subject_id for subject_id, class_id, name in
+                db.session.execute(db.select(Subject.id, Subject.class_id, Subject.name))}
+    chapters = {(subject_id, name.lower()): chapter_id for chapter_id, subject_id, name in
+                db.session.execute(db.select(Chapter.id, Chapter.subject_id, Chapter.name))}
+    topics = {(chapter_id, name.lower()) for chapter_id, name in
+              db.session.execute(db.select(Topic.chapter_id, Topic.name))}
+
+    created_subjects = created_chapters = created_topics = skipped = 0
+    errors = []
+    batch = []
+    topic_counts = defaultdict(int)
+
+    def flush():
+        if batch:
+            db.session.execute(Topic.__table__.insert(), batch)
+            batch.clear()
+
+    try:
+        for line, values in rows:
+            class_id = classes.get(values.get('class', '').lower())
+            if class_id is None:
+                errors.append((line, f"Unknown class '{values.get('class', '')}'"))
+                continue
+            if not values.get('subject') or not values.get('chapter'):
+                errors.append((line, 'Subject and chapter are required'))
+                continue
+
+            subject_key = (class_id, values['subject'].lower())
+            subject_id = subjects.get(subject_key)
+            if subject_id is None:
+                subject_id = db.session.execute(
+                    Subject.__table__.insert().values(name=values['subject'], class_id=class_id)
+                ).inserted_primary_key[0]
+                subjects[subject_key] = subject_id
+                created_subjects += 1
+
+            chapter_key = (subject_id, values['chapter'].lower())
+            chapter_id = chapters.get(chapter_key)
+            if chapter_id is None:
+                chapter_id = db.session.execute(
+                    Chapter.__table__.insert().values(name=values['chapter'], subject_id=subject_id)
+                ).inserted_primary_key[0]
+                chapters[chapter_key] = chapter_id
+                created_chapters += 1
+
+            topic = values.get('topic')
+            if not topic:
+                continue
+            if (chapter_id, topic.lower()) in topics:
+                skipped += 1
+                continue
+            topics.add((chapter_id, topic.lower()))
+            batch.append({'name': topic, 'chapter_id': chapter_id})
+            topic_counts[chapter_id] += 1
+            created_topics += 1
+            if len(batch) >= BATCH_SIZE:
+                flush()
+        flush()
+
+        if dry_run:
+            db.session.rollback()
+        elif created_subjects or created_chapters or created_topics:
+            apply_deltas({chapter_id: (count, 0) for chapter_id, count in topic_counts.items()})
+            bump_version()
+            if created_subjects or created_chapters:
+                invalidate_choices()
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return ImportResult(created_subjects, created_chapters, created_topics, skipped, errors)
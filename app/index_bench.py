@@ -0,0 +1,75 @@
+import sqlite3
+import time
+from sqlalchemy.dialects import sqlite
+from app.models import Class, Chapter, Topic, TopicCompletion, teacher_assignments, db
+from app.reports import report_statement
+from app.progress import aggregate_statement, summary_statement, chapter_counters_statement
+from app.teacher import assigned_subjects_statement
+
+
+def _sample_statements():
+    # Real ids from the database so the plans match what the views run
+    teacher_id = db.session.execute(db.select(teacher_assignments.c.teacher_id).limit(1)).scalar() or 0
+    class_id = db.session.execute(db.select(Class.id).limit(1)).scalar() or 0
+    subject_ids = db.session.execute(
+        db.select(teacher_assignments.c.subject_id).where(teacher_assignments.c.teacher_id == teacher_id)
+    ).scalars().all() or [0]
+    chapter_ids = db.session.execute(
+        db.select(Chapter.id).where(Chapter.subject_id.in_(subject_ids))
+    ).scalars().all() or [0]
+    topic_ids = db.session.execute(
+        db.select(Topic.id).where(Topic.chapter_id.in_(chapter_ids))
+    ).scalars().all() or [0]
+
+    return [
+        ('principal report, all classes', report_statement()),
+        ('principal report, one class', report_statement(class_id)),
+        ('progress summary from counters', summary_statement()),
+        ('progress chapters from counters', chapter_counters_statement()),
+        ('progress recount (verify)', aggregate_statement()),
+        ('teacher dashboard: assignments', assigned_subjects_statement(teacher_id)),
+        ('teacher dashboard: chapters', db.select(Chapter).where(Chapter.subject_id.in_(subject_ids))),
+        ('teacher dashboard: topics', db.select(Topic).where(Topic.chapter_id.in_(chapter_ids))),
+        ('teacher dashboard: completions', db.select(TopicCompletion).where(TopicCompletion.topic_id.in_(topic_ids))),
+    ]
+
+
+def _to_sql(statement):
+    return str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+
+
+def _measure(connection, sql, repeat):
+    plan = [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + sql)]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return plan, timings[len(timings) // 2]
+
+
+def explain_indexes(repeat=10):
+    """Plan and time the hot-path queries against an in-memory copy of the
+    database, first with the model indexes and then with them dropped.
+
+    Yields (label, indexed_plan, indexed_ms, unindexed_plan, unindexed_ms).
+    """
+    queries = [(label, _to_sql(statement)) for label, statement in _sample_statements()]
+    index_names = [index.name for table in db.metadata.tables.values() for index in table.indexes]
+
+    source = sqlite3.connect(db.engine.url.database)
+    # No statement cache: a cached EXPLAIN keeps its old plan after DROP INDEX
+    copy = sqlite3.connect(':memory:', cached_statements=0)
+    try:
+        source.backup(copy)
+        indexed = [_measure(copy, sql, repeat) for _, sql in queries]
+        for name in index_names:
+            copy.execute(f'DROP INDEX IF EXISTS {name}')
+        unindexed = [_measure(copy, sql, repeat) for _, sql in queries]
+    finally:
+        source.close()
+        copy.close()
+
+    for (label, _), (plan, ms), (bare_plan, bare_ms) in zip(queries, indexed, unindexed):
+        yield label, plan, ms, bare_plan, bare_ms
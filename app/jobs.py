@@ -0,0 +1,137 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from app.models import ReportJob, db
+from app.exports import write_excel, write_pdf
+from app.reports import get_report_rows
+from app.versioning import current_version
+
+# Renders run on a small per-process thread pool; the report_jobs table is
+# what every worker polls, so status and downloads work from any of them.
+RENDERERS = {
+    'pdf': (write_pdf, 'pdf'),
+    'excel': (write_excel, 'xlsx'),
+}
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _get_executor(app):
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=app.config.get('REPORT_JOB_WORKERS', 1),
+                                           thread_name_prefix='report-job')
+        return _executor
+
+
+def job_dir(app):
+    path = app.config.get('REPORT_JOB_DIR') or os.path.join(app.instance_path, 'reports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _job_path(app, job):
+    return os.path.join(job_dir(app), f'report_{job.id}.{RENDERERS[job.kind][1]}')
+
+
+def _stale_before(app):
+    # A job that has been queued or running this long is assumed lost with its worker
+    return datetime.utcnow() - timedelta(seconds=app.config.get('REPORT_JOB_TIMEOUT', 900))
+
+
+def enqueue_report(kind, class_id=None, user_id=None):
+    """Return a job rendering this report, reusing an identical queued, running or finished one."""
+    if kind not in RENDERERS:
+        raise ValueError(f'Unknown report kind: {kind}')
+    app = current_app._get_current_object()
+    version = current_version()
+    stale_before = _stale_before(app)
+
+    candidates = ReportJob.query.filter(
+        ReportJob.kind == kind,
+        ReportJob.class_id.is_(None) if class_id is None else ReportJob.class_id == class_id,
+        ReportJob.data_version == version,
+        ReportJob.status.in_(['queued', 'running', 'done'])
+    ).order_by(ReportJob.id.desc()).all()
+    for job in candidates:
+        if job.status == 'done' and job.file_path and os.path.exists(job.file_path):
+            return job
+        if job.status in ('queued', 'running') and job.created_at >= stale_before:
+            return job
+
+    job = ReportJob(kind=kind, class_id=class_id, data_version=version, requested_by=user_id)
+    db.session.add(job)
+    db.session.commit()
+    _get_executor(app).submit(_run_job, app, job.id)
+    return job
+
+
+def _run_job(app, job_id):
+    with app.app_context():
+        job = db.session.get(ReportJob, job_id)
+        job.status = 'running'
+        db.session.commit()
+
+        render = RENDERERS[job.kind][0]
+        path = _job_path(app, job)
+        try:
+            # Writes may have landed since the job was queued; record the version the
+            # rows were read at (they are at least that fresh) so dedup matches the file
+            job.data_version = current_version()
+            rows = get_report_rows(job.class_id)
+            with open(path + '.part', 'wb') as fileobj:
+                render(rows, fileobj)
+            os.replace(path + '.part', path)
+        except Exception as e:
+            app.logger.exception('Report job %s failed', job_id)
+            if os.path.exists(path + '.part'):
+                os.remove(path + '.part')
+            job.status = 'failed'
+            job.error = str(e)
+        else:
+            job.status = 'done'
+            job.file_path = path
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        if job.status == 'done':
+            _purge_jobs(app)
+
+
+def _purge_jobs(app):
+    # Failed jobs, and renders for older data versions than a finished one, will never
+    # be served again. They are kept for REPORT_JOB_RETENTION seconds so a download that is still in
+    # progress is not cut off. Jobs lost with their worker are failed here as well.
+    now = datetime.utcnow()
+    for lost in ReportJob.query.filter(
+        ReportJob.status.in_(['queued', 'running']),
+        ReportJob.created_at < _stale_before(app)
+    ).all():
+        partial = _job_path(app, lost) + '.part'
+        if os.path.exists(partial):
+            os.remove(partial)
+        lost.status = 'failed'
+        lost.error = 'Timed out'
+        lost.finished_at = now
+
+    latest = {
+        (kind, class_id): version for kind, class_id, version in db.session.execute(
+            db.select(ReportJob.kind, ReportJob.class_id, db.func.max(ReportJob.data_version))
+            .where(ReportJob.status == 'done')
+            .group_by(ReportJob.kind, ReportJob.class_id)
+        )
+    }
+    old_jobs = ReportJob.query.filter(
+        ReportJob.status.in_(['done', 'failed']),
+        ReportJob.finished_at < now - timedelta(seconds=app.config.get('REPORT_JOB_RETENTION', 600))
+    ).all()
+    for old in old_jobs:
+        if old.status == 'done' and old.data_version >= latest[(old.kind, old.class_id)]:
+            continue
+        if old.file_path and os.path.exists(old.file_path):
+            os.remove(old.file_path)
+        db.session.delete(old)
+    db.session.commit()
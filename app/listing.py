@@ -0,0 +1,63 @@
+import base64
+import json
+from typing import NamedTuple
+from flask import current_app, request
+from sqlalchemy import and_, or_
+from app.models import db
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: str  # None on the last page
+
+
+def encode_cursor(sort_value, row_id):
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        row_id = int(row_id)
+    except (ValueError, TypeError):
+        return None
+    # Cursors come back from the client; only a scalar can be compared with a column
+    if isinstance(sort_value, bool) or not isinstance(sort_value, (str, int, float)):
+        return None
+    return sort_value, row_id
+
+
+def page_size():
+    default = current_app.config.get('ADMIN_PAGE_SIZE', 50)
+    return min(max(request.args.get('per_page', default, type=int), 1), 200)
+
+
+def keyset_page(statement, sort_column, id_column, cursor=None, per_page=50, descending=False):
+    """One page of statement ordered by (sort_column, id_column), starting after cursor.
+
+    A single query however deep the page: the cursor holds the last row's sort
+    value and id, so the next page is a range seek instead of an OFFSET scan.
+    sort_column must not be NULL (wrap nullable columns in coalesce).
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        sort_value, last_id = position
+        if descending:
+            statement = statement.where(or_(sort_column < sort_value, and_(sort_column == sort_value, id_column < last_id)))
+        else:
+            statement = statement.where(or_(sort_column > sort_value, and_(sort_column == sort_value, id_column > last_id)))
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column, id_column)
+    rows = statement.add_columns(sort_column.label('_sort_key'), id_column.label('_row_id'))\
+        .order_by(*order).limit(per_page + 1)
+
+    items = db.session.execute(rows).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor(items[-1]._sort_key, items[-1]._row_id)
+    return Page(items, next_cursor)
+
+
+def wants_json():
+    return request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
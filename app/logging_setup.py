@@ -0,0 +1,72 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import has_request_context, request
+from flask.logging import default_handler
+
+# Everything under the 'app' logger (app.logger and logging.getLogger(__name__)
+# in the app package) goes through a QueueHandler: the request thread only
+# enqueues the record and a background listener does the formatting and I/O.
+# Keyword fields passed as extra={...} are kept as structured fields.
+
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+_listener = None
+
+
+def _fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class RequestFieldsFilter(logging.Filter):
+    # Runs in the request thread, before the record is queued
+    def filter(self, record):
+        if has_request_context():
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class KeyValueFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    def format(self, record):
+        line = super().format(record)
+        fields = ' '.join(f'{key}={value!r}' if isinstance(value, str) and ' ' in value else f'{key}={value}'
+                          for key, value in _fields(record).items())
+        return f'{line} {fields}' if fields else line
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        data.update(_fields(record))
+        return json.dumps(data, default=str)
+
+
+def init_logging(app):
+    global _listener
+    logger = logging.getLogger('app')
+    logger.setLevel(app.config.get('LOG_LEVEL') or ('DEBUG' if app.debug else 'INFO'))
+    logger.propagate = False
+    app.logger.removeHandler(default_handler)
+
+    if _listener is None:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(JSONFormatter() if app.config.get('LOG_FORMAT') == 'json' else KeyValueFormatter())
+        log_queue = queue.SimpleQueue()
+        handler = QueueHandler(log_queue)
+        handler.addFilter(RequestFieldsFilter())
+        logger.addHandler(handler)
+        _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
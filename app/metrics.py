@@ -0,0 +1,142 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+# Per-request SQL count and timing, collected from the engine's cursor events.
+# Each finished request adds a Server-Timing header and a sample to an
+# in-process ring buffer that the admin metrics page summarizes.
+
+
+class RequestSample(NamedTuple):
+    endpoint: str
+    method: str
+    status: int
+    wall_ms: float
+    queries: int
+    sql_ms: float
+    slowest_ms: float
+    slowest_statement: str
+    finished_at: float
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'sql_seconds', 'slowest_seconds', 'slowest_statement')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement = ''
+
+
+_lock = threading.Lock()
+_samples = deque(maxlen=5000)
+
+
+def samples():
+    with _lock:
+        return list(_samples)
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+
+
+def _percentile(sorted_values, percent):
+    # Nearest-rank percentile of an already sorted list
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(window=None):
+    """Per-endpoint request count, p50/p95/p99 wall time and query statistics, slowest p95 first.
+
+    window limits it to the most recent requests (at least one); None means all of them.
+    """
+    by_endpoint = {}
+    for sample in samples()[-max(window, 1):] if window is not None else samples():
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+    rows = []
+    for endpoint, items in by_endpoint.items():
+        wall = sorted(sample.wall_ms for sample in items)
+        queries = sorted(sample.queries for sample in items)
+        slowest = max(items, key=lambda sample: sample.slowest_ms)
+        rows.append({
+            'endpoint': endpoint,
+            'requests': len(items),
+            'p50_ms': _percentile(wall, 50),
+            'p95_ms': _percentile(wall, 95),
+            'p99_ms': _percentile(wall, 99),
+            'queries_p50': _percentile(queries, 50),
+            'queries_max': queries[-1],
+            'sql_ms_avg': sum(sample.sql_ms for sample in items) / len(items),
+            'slowest_ms': slowest.slowest_ms,
+            'slowest_statement': slowest.slowest_statement
+        })
+    rows.sort(key=lambda row: row['p95_ms'], reverse=True)
+    return rows
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the pooled connection, so a
+    # statement that fails (and never reaches after_cursor_execute) leaves nothing behind
+    context._metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._metrics_query_start
+    # Only statements run while serving a request are attributed; background
+    # threads (report jobs, login flushes) have no request to charge them to
+    if not has_request_context():
+        return
+    stats = g.get('request_stats')
+    if stats is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.queries += 1
+    stats.sql_seconds += elapsed
+    if elapsed > stats.slowest_seconds:
+        stats.slowest_seconds = elapsed
+        stats.slowest_statement = statement
+
+
+def init_metrics(app):
+    if not app.config.get('REQUEST_METRICS', True):
+        return
+    global _samples
+    with _lock:
+        if _samples.maxlen != app.config.get('REQUEST_METRICS_BUFFER', 5000):
+            _samples = deque(_samples, maxlen=app.config.get('REQUEST_METRICS_BUFFER', 5000))
+
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = g.pop('request_stats', None)
+        if stats is None or request.endpoint in (None, 'static'):
+            return response
+        wall_ms = (time.perf_counter() - stats.started) * 1000
+        sql_ms = stats.sql_seconds * 1000
+        response.headers.add('Server-Timing', f'app;dur={wall_ms:.1f}')
+        response.headers.add('Server-Timing', f'db;dur={sql_ms:.1f};desc="{stats.queries} queries"')
+        with _lock:
+            _samples.append(RequestSample(
+                request.endpoint, request.method, response.status_code, wall_ms, stats.queries, sql_ms,
+                stats.slowest_seconds * 1000, stats.slowest_statement[:500], time.time()
+            ))
+        return response
@@ -1,12 +1,52 @@
 from app import db, login_manager
+from app.cache import TTLCache
+from flask import current_app
+from sqlalchemy import event
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import json
 
+# Loaded users are cached as lightweight snapshots so authenticated requests
+# don't hit the users table every time. Entries are keyed by the 'users' data
+# version, which any flushed change to a user bumps (see _invalidate_user
+# below), so every worker stops serving the old snapshot once that commits.
+USERS = 'users'
+user_cache = TTLCache(maxsize=1024)
+
+class UserSnapshot:
+    """The parts of a User that role checks and templates need, detached from the session."""
+    __slots__ = ('id', 'username', 'email', 'full_name', 'role', 'is_active')
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.full_name = user.full_name
+        self.role = user.role
+        self.is_active = user.is_active
+
+    def get_id(self):
+        return str(self.id)
+
+    def get_user(self):
+        # Load the full ORM object only when a view actually needs it
+        return db.session.get(User, self.id)
+
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    from app.versioning import current_version
+    key = (int(id), current_version(USERS))
+    snapshot = user_cache.get(key)
+    if snapshot is None:
+        user = db.session.get(User, key[0])
+        if user is None:
+            return None
+        snapshot = UserSnapshot(user)
+        user_cache.set(key, snapshot, ttl=current_app.config.get('USER_CACHE_TTL', 60))
+    return snapshot
 
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
@@ -26,6 +66,13 @@ class User(UserMixin, db.Model):
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
 
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    # Covers profile edits, password changes and deactivation alike
+    from app.versioning import bump_version
+    bump_version(USERS, connection)
+
 class Class(db.Model):
     __tablename__ = 'classes'
     id = db.Column(db.Integer, primary_key=True)
@@ -39,13 +86,13 @@ class Section(db.Model):
     __tablename__ = 'sections'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(10), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
 
 class Group(db.Model):
     __tablename__ = 'groups'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(20), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
 
 # Association table for Teacher Assignments
 teacher_assignments = db.Table('teacher_assignments',
@@ -57,26 +104,31 @@ teacher_assignments = db.Table('teacher_assignments',
     db.Column('subject_id', db.Integer, db.ForeignKey('subjects.id'), nullable=False),
     db.Column('created_at', db.DateTime, default=datetime.utcnow)
 )
+# Authorization and the teacher dashboard look assignments up by teacher, then class and subject
+db.Index('ix_teacher_assignments_teacher_class_subject', teacher_assignments.c.teacher_id,
+         teacher_assignments.c.class_id, teacher_assignments.c.subject_id)
+# Reports and cache rebuilds come in from the subject side
+db.Index('ix_teacher_assignments_subject_class', teacher_assignments.c.subject_id, teacher_assignments.c.class_id)
 
 class Subject(db.Model):
     __tablename__ = 'subjects'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
-    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False)
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'), nullable=False, index=True)
     chapters = db.relationship('Chapter', backref='subject', lazy=True, cascade="all, delete-orphan")
 
 class Chapter(db.Model):
     __tablename__ = 'chapters'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False, index=True)
     topics = db.relationship('Topic', backref='chapter', lazy=True, cascade="all, delete-orphan")
 
 class Topic(db.Model):
     __tablename__ = 'topics'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
-    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id'), nullable=False, index=True)
     completion = db.relationship('TopicCompletion', uselist=False, backref='topic', cascade="all, delete-orphan")
 
 class TopicCompletion(db.Model):
@@ -86,6 +138,84 @@ class TopicCompletion(db.Model):
     completion_date = db.Column(db.Date, nullable=False)
     is_completed = db.Column(db.Boolean, default=False, nullable=False)
 
+    __table_args__ = (
+        # Partial index: only completed rows, which is all the progress recount ever reads
+        db.Index('ix_topic_completion_completed_topic', 'topic_id',
+                 sqlite_where=db.text('is_completed = 1'),
+                 postgresql_where=db.text('is_completed')),
+    )
+
+class CompletionEvent(db.Model):
+    # Append-only history of every check/uncheck, written alongside topic_completion
+    __tablename__ = 'completion_events'
+    id = db.Column(db.Integer, primary_key=True)
+    topic_id = db.Column(db.Integer, db.ForeignKey('topics.id'), nullable=False, index=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    is_completed = db.Column(db.Boolean, nullable=False)
+    occurred_on = db.Column(db.Date, nullable=False)
+    occurred_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class DailyProgress(db.Model):
+    # Per-subject daily rollup of completion_events; the analytics charts read only this
+    __tablename__ = 'daily_progress'
+    day = db.Column(db.Date, primary_key=True)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), primary_key=True)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    uncompleted = db.Column(db.Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_daily_progress_subject_day', 'subject_id', 'day'),
+    )
+
+class LoginEvent(db.Model):
+    # Append-only sign-in log, written in batches by app.activity
+    __tablename__ = 'login_events'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    logged_in_at = db.Column(db.DateTime, nullable=False)
+    ip_address = db.Column(db.String(45))
+
+class ProgressCounter(db.Model):
+    # Denormalized topic counts, one row per chapter/subject/class plus a single 'overall' row
+    __tablename__ = 'progress_counters'
+    scope = db.Column(db.String(10), primary_key=True) # 'chapter', 'subject', 'class', 'overall'
+    entity_id = db.Column(db.Integer, primary_key=True)
+    total_topics = db.Column(db.Integer, default=0, nullable=False)
+    completed_topics = db.Column(db.Integer, default=0, nullable=False)
+
+class DataVersion(db.Model):
+    # Counter bumped by every write that changes progress, syllabus or assignments
+    __tablename__ = 'data_versions'
+    name = db.Column(db.String(20), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+class ReportJob(db.Model):
+    # Background PDF/Excel renders; see app/jobs.py
+    __tablename__ = 'report_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False) # 'pdf', 'excel'
+    class_id = db.Column(db.Integer, db.ForeignKey('classes.id'))
+    data_version = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='queued') # 'queued', 'running', 'done', 'failed'
+    file_path = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_report_jobs_lookup', 'kind', 'class_id', 'data_version'),
+    )
+
+class ProgressSnapshot(db.Model):
+    # Per-subject (subject_id, total, completed) counts packed by app/snapshots.py
+    __tablename__ = 'progress_snapshots'
+    id = db.Column(db.Integer, primary_key=True)
+    snapshot_date = db.Column(db.Date, nullable=False, unique=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class EmailReport(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     principal_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
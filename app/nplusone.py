@@ -0,0 +1,87 @@
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from app import db
+
+# Flags a SELECT whose shape runs more than NPLUSONE_THRESHOLD times in one
+# request, which is what a lazy relationship walked in a loop or template
+# looks like. NPLUSONE_DETECT is 'off', 'warn' (log it) or 'raise' (fail the
+# request, meant for the test config so regressions break CI).
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+_IN_LIST = re.compile(r'\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACE = re.compile(r'\s+')
+
+
+class NPlusOneError(RuntimeError):
+    pass
+
+
+def fingerprint(statement):
+    # Same query shape regardless of literals or how many ids an IN list expanded to
+    statement = _SPACE.sub(' ', statement).strip()
+    statement = _IN_LIST.sub('(?)', statement)
+    return _NUMBER.sub('?', statement)
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Silence the detector for a block that repeats a query on purpose."""
+    previous = g.get('nplusone_allowed', False)
+    g.nplusone_allowed = True
+    try:
+        yield
+    finally:
+        g.nplusone_allowed = previous
+
+
+def _origin():
+    # Innermost app code and template frames that led to the statement
+    code = template = None
+    frame = sys._getframe(2)
+    while frame is not None and (code is None or template is None):
+        jinja_template = frame.f_globals.get('__jinja_template__')
+        if template is None and jinja_template is not None:
+            template = f'{jinja_template.name or "<string>"}:{jinja_template.get_corresponding_lineno(frame.f_lineno)}'
+        filename = frame.f_code.co_filename
+        if code is None and filename.startswith(APP_DIR) and filename != __file__:
+            code = f'{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return code, template
+
+
+def init_nplusone(app):
+    mode = app.config.get('NPLUSONE_DETECT', 'off')
+    if mode not in ('warn', 'raise'):
+        return
+    threshold = app.config.get('NPLUSONE_THRESHOLD', 5)
+
+    def check_statement(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not has_request_context() or g.get('nplusone_allowed'):
+            return
+        if statement.lstrip()[:6].upper().rstrip() not in ('SELECT', 'WITH'):
+            return
+        counts = g.setdefault('nplusone_counts', Counter())
+        shape = fingerprint(statement)
+        counts[shape] += 1
+        if counts[shape] != threshold + 1:
+            return
+
+        code, template = _origin()
+        message = (f'N+1 query: the same SELECT ran more than {threshold} times in {request.endpoint} '
+                   f'(from {code or "unknown"}{", template " + template if template else ""}): {shape[:200]}')
+        if mode == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message, extra={'endpoint': request.endpoint, 'origin': code, 'template': template,
+                                       'threshold': threshold})
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', check_statement)
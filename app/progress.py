@@ -0,0 +1,178 @@
+from flask import g, has_app_context
+from sqlalchemy import func, and_
+from sqlalchemy.orm import aliased
+from app.models import Class, Subject, Chapter, Topic, TopicCompletion, ProgressCounter, db
+
+# entity_id of the single 'overall' progress counter row
+OVERALL_ID = 0
+
+
+class ProgressNode:
+    __slots__ = ('id', 'name', 'parent_id', 'total', 'completed', 'children')
+
+    def __init__(self, id, name=None, parent_id=None):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+        self.total = 0
+        self.completed = 0
+        self.children = []
+
+    @property
+    def progress(self):
+        if self.total == 0:
+            return 0
+        return round((self.completed / self.total) * 100)
+
+
+class ProgressTree:
+    """Topic totals and completed counts rolled up chapter -> subject -> class -> overall."""
+
+    def __init__(self):
+        self.overall = ProgressNode(None, 'Overall')
+        self.classes = {}
+        self.subjects = {}
+        self.chapters = {}
+
+    def get(self, entity_id, entity_type):
+        if entity_type == 'class':
+            return self.classes.get(entity_id)
+        if entity_type == 'subject':
+            return self.subjects.get(entity_id)
+        if entity_type == 'chapter':
+            return self.chapters.get(entity_id)
+        return None
+
+    def progress(self, entity_id, entity_type):
+        node = self.get(entity_id, entity_type)
+        return node.progress if node else 0
+
+    def add_class(self, class_id, name, total, completed):
+        cls = self.classes[class_id] = ProgressNode(class_id, name)
+        cls.total, cls.completed = total, completed
+        self.overall.children.append(cls)
+        return cls
+
+    def add_subject(self, subject_id, name, class_id, total, completed):
+        subject = self.subjects[subject_id] = ProgressNode(subject_id, name, class_id)
+        subject.total, subject.completed = total, completed
+        self.classes[class_id].children.append(subject)
+        return subject
+
+    def add_chapter(self, chapter_id, name, subject_id, total, completed):
+        chapter = self.chapters[chapter_id] = ProgressNode(chapter_id, name, subject_id)
+        chapter.total, chapter.completed = total, completed
+        self.subjects[subject_id].children.append(chapter)
+        return chapter
+
+    def add_row(self, class_id, class_name, subject_id, subject_name, chapter_id, chapter_name, total, completed):
+        cls = self.classes.get(class_id)
+        if cls is None:
+            cls = self.classes[class_id] = ProgressNode(class_id, class_name)
+            self.overall.children.append(cls)
+        nodes = [self.overall, cls]
+
+        if subject_id is not None:
+            subject = self.subjects.get(subject_id)
+            if subject is None:
+                subject = self.subjects[subject_id] = ProgressNode(subject_id, subject_name, class_id)
+                cls.children.append(subject)
+            nodes.append(subject)
+
+            if chapter_id is not None:
+                chapter = self.chapters[chapter_id] = ProgressNode(chapter_id, chapter_name, subject_id)
+                subject.children.append(chapter)
+                nodes.append(chapter)
+
+        for node in nodes:
+            node.total += total
+            node.completed += completed
+
+
+def aggregate_statement():
+    # Recount from the topics table: one row per chapter (or per empty class/subject)
+    return db.select(
+        Class.id, Class.name,
+        Subject.id, Subject.name,
+        Chapter.id, Chapter.name,
+        func.count(Topic.id),
+        func.count(TopicCompletion.id)
+    ).select_from(Class)\
+    .outerjoin(Subject, Subject.class_id == Class.id)\
+    .outerjoin(Chapter, Chapter.subject_id == Subject.id)\
+    .outerjoin(Topic, Topic.chapter_id == Chapter.id)\
+    .outerjoin(TopicCompletion, and_(TopicCompletion.topic_id == Topic.id, TopicCompletion.is_completed == True))\
+    .group_by(Class.id, Subject.id, Chapter.id)\
+    .order_by(Class.id, Subject.id, Chapter.id)
+
+
+def summary_statement():
+    # One row per subject (or per empty class) with the class and subject counters
+    # as maintained on write, so no chapter rows are read or summed
+    ClassCounter = aliased(ProgressCounter)
+    SubjectCounter = aliased(ProgressCounter)
+    return db.select(
+        Class.id, Class.name,
+        func.coalesce(ClassCounter.total_topics, 0), func.coalesce(ClassCounter.completed_topics, 0),
+        Subject.id, Subject.name,
+        func.coalesce(SubjectCounter.total_topics, 0), func.coalesce(SubjectCounter.completed_topics, 0)
+    ).select_from(Class)\
+    .outerjoin(ClassCounter, and_(ClassCounter.scope == 'class', ClassCounter.entity_id == Class.id))\
+    .outerjoin(Subject, Subject.class_id == Class.id)\
+    .outerjoin(SubjectCounter, and_(SubjectCounter.scope == 'subject', SubjectCounter.entity_id == Subject.id))\
+    .order_by(Class.id, Subject.id)
+
+
+def chapter_counters_statement():
+    return db.select(
+        Chapter.id, Chapter.name, Chapter.subject_id,
+        func.coalesce(ProgressCounter.total_topics, 0),
+        func.coalesce(ProgressCounter.completed_topics, 0)
+    ).select_from(Chapter)\
+    .outerjoin(ProgressCounter, and_(ProgressCounter.scope == 'chapter', ProgressCounter.entity_id == Chapter.id))\
+    .order_by(Chapter.subject_id, Chapter.id)
+
+
+def build_progress_tree(recount=False, chapters=False):
+    """Build the progress tree; chapters=True also loads per-chapter nodes.
+
+    recount=True aggregates the topics table instead of reading the counters
+    (and always includes chapters); it is what the counters are checked against.
+    """
+    tree = ProgressTree()
+    if recount:
+        for row in db.session.execute(aggregate_statement()):
+            tree.add_row(*row)
+        return tree
+
+    for class_id, class_name, class_total, class_completed, subject_id, subject_name, total, completed \
+            in db.session.execute(summary_statement()):
+        if class_id not in tree.classes:
+            tree.add_class(class_id, class_name, class_total, class_completed)
+        if subject_id is not None:
+            tree.add_subject(subject_id, subject_name, class_id, total, completed)
+    overall = db.session.execute(
+        db.select(ProgressCounter.total_topics, ProgressCounter.completed_topics)
+        .where(ProgressCounter.scope == 'overall', ProgressCounter.entity_id == OVERALL_ID)
+    ).first()
+    if overall is not None:
+        tree.overall.total, tree.overall.completed = overall
+    if chapters:
+        for row in db.session.execute(chapter_counters_statement()):
+            tree.add_chapter(*row)
+    return tree
+
+
+def get_progress_tree(chapters=False):
+    # Built at most once per request; later callers in the same request reuse it,
+    # and a tree with chapters also serves callers that only need the summary
+    if not has_app_context():
+        return build_progress_tree(chapters=chapters)
+    if 'progress_tree' in g:
+        return g.progress_tree
+    if chapters:
+        g.progress_tree = build_progress_tree(chapters=True)
+        return g.progress_tree
+    if 'progress_summary' not in g:
+        g.progress_summary = build_progress_tree()
+    return g.progress_summary
@@ -0,0 +1,60 @@
+from typing import NamedTuple
+from app.cache import TTLCache
+from app.models import Class, Subject, User, db, teacher_assignments
+from app.progress import get_progress_tree
+from app.versioning import current_version
+
+
+class ReportRow(NamedTuple):
+    teacher_name: str
+    class_name: str
+    subject_name: str
+    total_topics: int
+    completed_topics: int
+
+    @property
+    def progress(self):
+        if self.total_topics == 0:
+            return 0
+        return round((self.completed_topics / self.total_topics) * 100)
+
+
+# Keyed by (class_id, data version): any completion, syllabus or assignment
+# write bumps the version, so stale entries are simply never asked for again.
+_report_cache = TTLCache(maxsize=64, ttl=600)
+
+
+def report_statement(class_id=None):
+    # One row per distinct teacher/class/subject assignment; topic counts come from the progress tree
+    statement = db.select(
+        User.full_name.label('teacher_name'),
+        Class.name.label('class_name'),
+        Subject.id.label('subject_id'),
+        Subject.name.label('subject_name')
+    ).select_from(User).join(teacher_assignments).join(Class).join(Subject)\
+    .group_by(User.id, Class.id, Subject.id)\
+    .order_by(Class.id, Subject.name, User.full_name)
+    if class_id:
+        statement = statement.where(Class.id == class_id)
+    return statement
+
+
+def build_report_rows(class_id=None):
+    tree = get_progress_tree()
+    rows = []
+    for row in db.session.execute(report_statement(class_id)):
+        node = tree.subjects.get(row.subject_id)
+        if node is None or node.total == 0:
+            continue
+        rows.append(ReportRow(row.teacher_name, row.class_name, row.subject_name, node.total, node.completed))
+    return tuple(rows)
+
+
+def get_report_rows(class_id=None):
+    """Report rows for one class (or all), shared by the HTML, PDF and Excel views."""
+    key = (class_id or None, current_version())
+    rows = _report_cache.get(key)
+    if rows is None:
+        rows = build_report_rows(class_id)
+        _report_cache.set(key, rows)
+    return rows
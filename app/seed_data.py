@@ -114,6 +114,10 @@ with app.app_context():
         db.session.commit()
     print("Teacher assigned.")
 
+    # Topics above were inserted directly, so fill the progress counters in one pass
+    from app.counters import rebuild_counters
+    rebuild_counters()
+
 
     print("\nDatabase seeding complete!")
     print("--- Login Credentials ---")
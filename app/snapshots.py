@@ -0,0 +1,80 @@
+import struct
+from datetime import datetime
+from app.models import ProgressSnapshot, CompletionEvent, User, db
+
+# A snapshot is the per-subject counts as little-endian uint32 triples
+# (subject_id, total_topics, completed_topics) sorted by subject_id:
+# 12 bytes per subject instead of a JSON document.
+_RECORD = struct.Struct('<III')
+
+
+def subject_counts(tree):
+    return {subject.id: (subject.total, subject.completed) for subject in tree.subjects.values()}
+
+
+def pack_counts(counts):
+    return b''.join(_RECORD.pack(subject_id, total, completed)
+                    for subject_id, (total, completed) in sorted(counts.items()))
+
+
+def unpack_counts(data):
+    return {subject_id: (total, completed) for subject_id, total, completed in _RECORD.iter_unpack(data)}
+
+
+def previous_snapshot(before_date):
+    return ProgressSnapshot.query.filter(ProgressSnapshot.snapshot_date < before_date)\
+        .order_by(ProgressSnapshot.snapshot_date.desc()).first()
+
+
+def save_snapshot(snapshot_date, counts):
+    snapshot = ProgressSnapshot.query.filter_by(snapshot_date=snapshot_date).first()
+    if snapshot is None:
+        snapshot = ProgressSnapshot(snapshot_date=snapshot_date)
+        db.session.add(snapshot)
+    snapshot.data = pack_counts(counts)
+    # Changes are counted from this moment on, so a re-sent digest moves it forward
+    snapshot.created_at = datetime.utcnow()
+    return snapshot
+
+
+def completions_since(since=None):
+    """{topic_id: (subject_id, teacher_id)} for topics unticked at `since` and ticked now.
+
+    Every event is a real flip, so a topic counts when its first event after
+    `since` ticks it and its last leaves it ticked; unticks and re-ticks of a
+    topic that was already done count for nothing. The teacher is whoever
+    ticked it last.
+    """
+    statement = db.select(CompletionEvent.topic_id, CompletionEvent.subject_id,
+                          CompletionEvent.teacher_id, CompletionEvent.is_completed)\
+        .order_by(CompletionEvent.id)
+    if since is not None:
+        statement = statement.where(CompletionEvent.occurred_at > since)
+    first, last = {}, {}
+    for event in db.session.execute(statement):
+        first.setdefault(event.topic_id, event)
+        last[event.topic_id] = event
+    return {topic_id: (event.subject_id, event.teacher_id) for topic_id, event in last.items()
+            if event.is_completed and first[topic_id].is_completed}
+
+
+def summarize_completions(completions, tree):
+    """Roll completions_since() up per class and per teacher who did the ticking."""
+    classes, teachers = {}, {}
+    for subject_id, teacher_id in completions.values():
+        subject = tree.subjects.get(subject_id)
+        if subject is not None:
+            classes[subject.parent_id] = classes.get(subject.parent_id, 0) + 1
+        if teacher_id is not None:
+            teachers[teacher_id] = teachers.get(teacher_id, 0) + 1
+
+    names = dict(db.session.execute(
+        db.select(User.id, User.full_name).where(User.id.in_(teachers))
+    ).all()) if teachers else {}
+    return {
+        'classes': [{'name': tree.classes[class_id].name, 'completed': completed}
+                    for class_id, completed in classes.items() if class_id in tree.classes],
+        'teachers': [{'name': names.get(teacher_id, 'Unknown'), 'completed': completed}
+                     for teacher_id, completed in sorted(teachers.items(), key=lambda item: -item[1])],
+        'completed': len(completions)
+    }
@@ -0,0 +1,35 @@
+from sqlalchemy import event
+from app import db
+
+# Read back at startup so the log shows what SQLite actually accepted
+# (journal_mode, for instance, silently stays 'memory' for in-memory DBs).
+REPORTED_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size',
+                    'cache_size', 'temp_store', 'foreign_keys')
+
+
+def init_sqlite(app):
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        return
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+
+    with app.app_context():
+        engine = db.engine
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+
+        with engine.connect() as connection:
+            effective = {
+                name: connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+                for name in REPORTED_PRAGMAS
+            }
+        app.logger.info('SQLite pragmas in effect: %s; pool: %s',
+                        ', '.join(f'{k}={v}' for k, v in effective.items()),
+                        engine.pool.status())
+        # Don't leave the probe connection pooled: with gunicorn --preload every
+        # forked worker would inherit (and share) it
+        engine.dispose()
@@ -1,3 +1,127 @@
-// This file can be used for more complex chart initializations if needed
-// For now, the chart logic is directly in the principal dashboard template.
-console.log("charts.js loaded");
\ No newline at end of file
+// Principal dashboard charts, fed by the JSON progress API.
+// The API answers with an ETag, so the browser revalidates with If-None-Match
+// and gets a 304 while nothing has changed.
+
+function fetchProgress(url) {
+    return fetch(url, {headers: {'Accept': 'application/json'}})
+        .then(response => response.json());
+}
+
+function renderClassProgress(canvas, classes) {
+    return new Chart(canvas.getContext('2d'), {
+        type: 'bar',
+        data: {
+            labels: classes.map(cls => cls.name),
+            datasets: [{
+                label: 'Progress %',
+                data: classes.map(cls => cls.progress),
+                backgroundColor: 'rgba(54, 162, 235, 0.6)',
+                borderColor: 'rgba(54, 162, 235, 1)',
+                borderWidth: 1
+            }]
+        },
+        options: {
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    max: 100
+                }
+            }
+        }
+    });
+}
+
+function renderSubjectProgress(canvas, subjects) {
+    return new Chart(canvas.getContext('2d'), {
+        type: 'pie',
+        data: {
+            labels: subjects.map(subject => `${subject.name} (${subject.class_name})`),
+            datasets: [{
+                label: 'Progress %',
+                data: subjects.map(subject => subject.progress),
+                backgroundColor: [
+                    'rgba(255, 99, 132, 0.6)',
+                    'rgba(54, 162, 235, 0.6)',
+                    'rgba(255, 206, 86, 0.6)',
+                    'rgba(75, 192, 192, 0.6)',
+                    'rgba(153, 102, 255, 0.6)',
+                    'rgba(255, 159, 64, 0.6)'
+                ],
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: {
+                    position: 'top',
+                },
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            let label = context.label || '';
+                            if (label) {
+                                label += ': ';
+                            }
+                            if (context.parsed !== null) {
+                                label += context.parsed + '%';
+                            }
+                            return label;
+                        }
+                    }
+                }
+            }
+        }
+    });
+}
+
+function applyProgress(chart, ids, updates) {
+    updates.forEach(update => {
+        const index = ids.indexOf(update.id);
+        if (index !== -1) {
+            chart.data.datasets[0].data[index] = update.progress;
+        }
+    });
+    chart.update();
+}
+
+function initPrincipalDashboard(urls) {
+    let classChart = null, subjectChart = null;
+    let classIds = [], subjectIds = [];
+
+    function load() {
+        fetchProgress(urls.classes).then(data => {
+            document.getElementById('overallProgress').textContent = data.overall.progress + '%';
+            classIds = data.classes.map(cls => cls.id);
+            if (classChart) {
+                classChart.destroy();
+            }
+            classChart = renderClassProgress(document.getElementById('classProgressChart'), data.classes);
+        });
+        fetchProgress(urls.subjects).then(data => {
+            subjectIds = data.subjects.map(subject => subject.id);
+            if (subjectChart) {
+                subjectChart.destroy();
+            }
+            subjectChart = renderSubjectProgress(document.getElementById('subjectProgressChart'), data.subjects);
+        });
+    }
+
+    load();
+
+    if (urls.stream && window.EventSource) {
+        const stream = new EventSource(urls.stream);
+        // Teachers' checkbox changes arrive as the new counters for the affected class and subjects
+        stream.addEventListener('progress', event => {
+            const data = JSON.parse(event.data);
+            if (data.overall) {
+                document.getElementById('overallProgress').textContent = data.overall.progress + '%';
+            }
+            if (classChart && subjectChart) {
+                applyProgress(classChart, classIds, data.classes);
+                applyProgress(subjectChart, subjectIds, data.subjects);
+            }
+        });
+        // Something else changed (e.g. the syllabus, or a write in another worker): refetch
+        stream.addEventListener('refresh', load);
+    }
+}
@@ -1,44 +1,56 @@
 from flask import Blueprint, render_template, abort
 from flask_login import login_required, current_user
-from app.models import Subject, Chapter, Topic, TopicCompletion, Class, Section, Group, db, teacher_assignments
-from app.utils import calculate_progress, role_required
+from app.models import Subject, Chapter, Topic, Class, Section, Group, db, teacher_assignments
+from app.utils import role_required
+from app.progress import get_progress_tree
 from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 
 bp = Blueprint('teacher', __name__)
 
+def assigned_subjects_statement(teacher_id):
+    # Complex query to get all subjects assigned to a teacher
+    return db.select(
+        Subject.id, Subject.name,
+        Class.id.label('class_id'), Class.name.label('class_name'),
+        Section.id.label('section_id'), Section.name.label('section_name'),
+        Group.id.label('group_id'), Group.name.label('group_name')
+    ).select_from(Subject).join(teacher_assignments).join(Class)\
+    .join(Section, teacher_assignments.c.section_id == Section.id, isouter=True)\
+    .join(Group, teacher_assignments.c.group_id == Group.id, isouter=True)\
+    .where(teacher_assignments.c.teacher_id == teacher_id)
+
 @bp.route('/')
 @role_required('teacher')
 @login_required
 def dashboard():
-    # Complex query to get all subjects assigned to the current teacher
-    assigned_data = db.session.execute(
-        db.select(
-            Subject.id, Subject.name,
-            Class.id.label('class_id'), Class.name.label('class_name'),
-            Section.id.label('section_id'), Section.name.label('section_name'),
-            Group.id.label('group_id'), Group.name.label('group_name')
-        ).select_from(Subject).join(teacher_assignments).join(Class)
-        .join(Section, teacher_assignments.c.section_id == Section.id, isouter=True)
-        .join(Group, teacher_assignments.c.group_id == Group.id, isouter=True)
-        .where(teacher_assignments.c.teacher_id == current_user.id)
-    ).all()
+    assigned_data = db.session.execute(assigned_subjects_statement(current_user.id)).all()
+
+    # Load the whole subject -> chapter -> topic -> completion tree up front,
+    # one SELECT per level regardless of how many topics there are
+    subject_ids = {data.id for data in assigned_data}
+    subjects = {}
+    if subject_ids:
+        subjects = {s.id: s for s in Subject.query.options(
+            selectinload(Subject.chapters).selectinload(Chapter.topics).selectinload(Topic.completion)
+        ).filter(Subject.id.in_(subject_ids)).all()}
 
+    tree = get_progress_tree(chapters=True)
     subjects_with_progress = []
     for data in assigned_data:
-        subject = Subject.query.get(data.id)
-        progress = calculate_progress(subject.id, 'subject')
+        subject = subjects[data.id]
+        progress = tree.progress(subject.id, 'subject')
         
         chapters_with_topics = []
         for chapter in subject.chapters:
-            chapter_progress = calculate_progress(chapter.id, 'chapter')
-            total_topics = len(chapter.topics)
-            completed_topics = TopicCompletion.query.join(Topic).filter(
-                Topic.chapter_id == chapter.id, TopicCompletion.is_completed == True
-            ).count()
+            chapter_node = tree.chapters.get(chapter.id)
+            chapter_progress = chapter_node.progress if chapter_node else 0
+            total_topics = chapter_node.total if chapter_node else 0
+            completed_topics = chapter_node.completed if chapter_node else 0
             
             topics_data = []
             for topic in chapter.topics:
-                completion = TopicCompletion.query.filter_by(topic_id=topic.id).first()
+                completion = topic.completion
                 topics_data.append({
                     'id': topic.id,
                     'name': topic.name,
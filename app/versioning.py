@@ -0,0 +1,55 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models import DataVersion, db
+
+# The current version is kept per process and re-read from the database at
+# most once every DATA_VERSION_TTL seconds, so other workers' writes are seen
+# within that window while this worker's own writes are seen immediately.
+GLOBAL = 'global'
+
+_lock = threading.Lock()
+_cached = {}  # name -> (version, fetched_at)
+
+
+def bump_version(name=GLOBAL, connection=None):
+    # Runs inside the caller's transaction; the local cache is dropped once it commits.
+    # Mapper events pass their connection, since the session cannot execute mid-flush.
+    execute = (connection or db.session).execute
+    table = DataVersion.__table__
+    result = execute(
+        table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        execute(table.insert().values(name=name, version=1))
+    db.session.info.setdefault('bumped_versions', set()).add(name)
+
+
+def current_version(name=GLOBAL):
+    ttl = current_app.config.get('DATA_VERSION_TTL', 2)
+    with _lock:
+        cached = _cached.get(name)
+    if cached is not None and time.monotonic() - cached[1] < ttl:
+        return cached[0]
+    version = db.session.execute(
+        db.select(DataVersion.version).where(DataVersion.name == name)
+    ).scalar() or 0
+    with _lock:
+        _cached[name] = (version, time.monotonic())
+    return version
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_bumped_versions(session):
+    names = session.info.pop('bumped_versions', None)
+    if names:
+        with _lock:
+            for name in names:
+                _cached.pop(name, None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bumps(session):
+    session.info.pop('bumped_versions', None)
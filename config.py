@@ -1,4 +1,5 @@
 import os
+from datetime import date
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -8,11 +9,116 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'instance', 'syllabus_tracker.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Applied to every new SQLite connection (see app/sqlite_profile.py)
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,
+    }
+
+    # Seconds before a worker rebuilds its cached teacher assignment set
+    AUTHZ_CACHE_TTL = int(os.environ.get('AUTHZ_CACHE_TTL') or 300)
+    # Seconds a logged-in user's snapshot is served from memory
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)
+    # Seconds between batched writes of buffered sign-ins (0 = only flush at exit)
+    LOGIN_ACTIVITY_FLUSH_INTERVAL = int(os.environ.get('LOGIN_ACTIVITY_FLUSH_INTERVAL') or 5)
+    # Most sign-ins held in memory while the database is unreachable (oldest dropped first)
+    LOGIN_ACTIVITY_BUFFER_MAX = int(os.environ.get('LOGIN_ACTIVITY_BUFFER_MAX') or 10000)
+    # Seconds a worker trusts its cached data version before re-reading it
+    DATA_VERSION_TTL = float(os.environ.get('DATA_VERSION_TTL') or 2)
+    # Last teaching day of the term (YYYY-MM-DD); burn-down charts project against it
+    TERM_END_DATE = date.fromisoformat(os.environ['TERM_END_DATE']) if os.environ.get('TERM_END_DATE') else None
+    # Days of net completions averaged into the projected pace
+    PROGRESS_VELOCITY_WINDOW = int(os.environ.get('PROGRESS_VELOCITY_WINDOW') or 14)
+    # Seconds the admin form dropdown choices are kept before being rebuilt
+    CHOICE_CACHE_TTL = int(os.environ.get('CHOICE_CACHE_TTL') or 300)
+    # Rows per page on the admin user, class, subject and assignment listings
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE') or 50)
+    # Chapters or topics per page when expanding the admin syllabus tree
+    SYLLABUS_PAGE_SIZE = int(os.environ.get('SYLLABUS_PAGE_SIZE') or 50)
+    # Seconds between keepalives on a live progress stream (each also checks the data version)
+    SSE_HEARTBEAT = int(os.environ.get('SSE_HEARTBEAT') or 15)
+    # Seconds before a live progress stream is closed and the browser reconnects
+    SSE_STREAM_TIMEOUT = int(os.environ.get('SSE_STREAM_TIMEOUT') or 300)
+    # Threads rendering PDF/Excel report jobs in each worker process
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS') or 1)
+    # Seconds after which an unfinished report job is treated as lost and re-queued
+    REPORT_JOB_TIMEOUT = int(os.environ.get('REPORT_JOB_TIMEOUT') or 900)
+    # Seconds a superseded report file is kept, so downloads already under way can finish
+    REPORT_JOB_RETENTION = int(os.environ.get('REPORT_JOB_RETENTION') or 600)
+    # Where finished report files are kept (defaults to instance/reports)
+    REPORT_JOB_DIR = os.environ.get('REPORT_JOB_DIR')
     
+    # Record per-request SQL counts and timings (Server-Timing header, /admin/metrics)
+    REQUEST_METRICS = os.environ.get('REQUEST_METRICS', 'true').lower() in ['true', 'on', '1']
+    # Most recent requests kept for the metrics page
+    REQUEST_METRICS_BUFFER = int(os.environ.get('REQUEST_METRICS_BUFFER') or 5000)
+    # N+1 detection: 'off', 'warn' or 'raise' once one SELECT shape runs more than NPLUSONE_THRESHOLD times in a request
+    NPLUSONE_DETECT = os.environ.get('NPLUSONE_DETECT', 'off')
+    NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD') or 5)
+    # Log level for the app's loggers (default DEBUG when DEBUG is on, else INFO) and 'text' or 'json' output
+    LOG_LEVEL = os.environ.get('LOG_LEVEL')
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')
+
     # Email configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
     MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS', 'true').lower() in ['true', 'on', '1']
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
-    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
\ No newline at end of file
+    MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    # Reconnect attempts per digest email, waiting DIGEST_RETRY_BACKOFF * 2**attempt seconds
+    DIGEST_MAX_RETRIES = int(os.environ.get('DIGEST_MAX_RETRIES') or 3)
+    DIGEST_RETRY_BACKOFF = float(os.environ.get('DIGEST_RETRY_BACKOFF') or 1)
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    NPLUSONE_DETECT = os.environ.get('NPLUSONE_DETECT', 'warn')
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    MAIL_SUPPRESS_SEND = True
+    # No background flusher thread issuing SQL while a test counts statements
+    LOGIN_ACTIVITY_FLUSH_INTERVAL = 0
+    # Any N+1 regression fails the request, and with it the test
+    NPLUSONE_DETECT = 'raise'
+
+
+class ProductionConfig(Config):
+    # Tuned for several gunicorn workers sharing one SQLite file: WAL lets
+    # readers run alongside the single writer, and busy_timeout makes a
+    # writer wait for the lock instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 15000),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB') or 64000),
+        'temp_store': 'MEMORY',
+    }
+    # Per worker; keep it small since SQLite only ever has one writer
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE') or 5),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW') or 5),
+        'pool_timeout': 30,
+        'pool_recycle': 3600,
+        'pool_pre_ping': True,
+    }
+
+
+config_by_name = {
+    'default': Config,
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    # APP_ENV selects the profile, e.g. APP_ENV=production under gunicorn
+    name = name or os.environ.get('APP_ENV') or 'default'
+    return config_by_name[name]
@@ -0,0 +1,42 @@
+import pytest
+from app import create_app, db
+from app.activity import flush as flush_login_activity
+from app.models import User
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+    # Contexts are pushed only around setup and teardown; each test request then
+    # gets its own, so g (and the logged-in user) never leaks between clients
+    app = create_app(TestingConfig)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        # Buffered sign-ins would otherwise be written at exit, after the tables are gone
+        flush_login_activity()
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username, role='teacher'):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', full_name=username.title(), role=role)
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+    return make_user
+
+
+def login(client, username):
+    response = client.post('/auth/login', data={'username': username, 'password': 'password'})
+    assert response.status_code == 302
+    assert not response.location.endswith('/auth/login')
+    # A redirect alone is not proof: an already-authenticated request redirects too
+    with client.session_transaction() as session:
+        assert session.get('_user_id')
+    return client
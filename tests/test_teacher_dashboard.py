@@ -0,0 +1,69 @@
+from datetime import date
+from sqlalchemy import event
+from app import db
+from app.models import Class, Subject, Chapter, Topic, TopicCompletion, teacher_assignments
+from app.counters import rebuild_counters
+from tests.conftest import login
+
+
+def add_syllabus(class_id, teacher_id, name, chapters, topics_per_chapter):
+    subject = Subject(name=name, class_id=class_id)
+    db.session.add(subject)
+    db.session.flush()
+    for i in range(chapters):
+        chapter = Chapter(name=f'Chapter {i + 1}', subject_id=subject.id)
+        db.session.add(chapter)
+        db.session.flush()
+        for j in range(topics_per_chapter):
+            topic = Topic(name=f'Topic {i + 1}.{j + 1}', chapter_id=chapter.id)
+            db.session.add(topic)
+            db.session.flush()
+            # Tick every other topic so completions are loaded too
+            if j % 2 == 0:
+                db.session.add(TopicCompletion(topic_id=topic.id, teacher_id=teacher_id,
+                                                completion_date=date.today(), is_completed=True))
+    db.session.execute(teacher_assignments.insert().values(
+        teacher_id=teacher_id, class_id=class_id, subject_id=subject.id))
+    db.session.commit()
+
+
+def count_queries(app, client, url):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert response.status_code == 200
+    return len(statements), response.get_data(as_text=True)
+
+
+def test_dashboard_query_count_does_not_grow_with_syllabus(app, make_user):
+    small_teacher = make_user('small')
+    large_teacher = make_user('large')
+    with app.app_context():
+        class_ = Class(name='Class 7')
+        db.session.add(class_)
+        db.session.commit()
+        add_syllabus(class_.id, small_teacher, 'English', chapters=2, topics_per_chapter=2)
+        add_syllabus(class_.id, large_teacher, 'Science', chapters=20, topics_per_chapter=15)
+        rebuild_counters()
+
+    small = login(app.test_client(), 'small')
+    large = login(app.test_client(), 'large')
+    # Warm the per-process caches (user, data version, progress tree) for both
+    small.get('/teacher/')
+    large.get('/teacher/')
+
+    small_count, small_page = count_queries(app, small, '/teacher/')
+    large_count, large_page = count_queries(app, large, '/teacher/')
+    # Make sure each client really sees its own syllabus
+    assert 'English' in small_page and 'Science' not in small_page
+    assert 'Science' in large_page and 'Topic 20.15' in large_page
+    assert large_count == small_count